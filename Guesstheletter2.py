@@ -1,17 +1,39 @@
+from startup import StartupTimer  # first, so startup timing covers the imports below
 import tkinter as tk
 from tkinter import messagebox
 import random
 import os
-from datetime import datetime
-from PIL import Image, ImageTk
-import pygame
-from dictionary import EASY_WORDS, MEDIUM_WORDS, HARD_WORDS, LETTER_EMOJI_MAP, FALLBACK_EMOJI, WORD_IMAGES
+import sys
+import queue
+import threading
+import uuid
+import assets
+from assets import ImagePrefetcher, ImageCache
+from emoji_cache import EmojiCache, all_emoji
+from hot_reload import ContentReloader, RELOAD_INTERVAL
+from asset_bundle import AssetSource
+from sounds import SoundManager
+from engine import GameEngine, IGNORED, CORRECT, WRONG, WORD_DONE, GAME_OVER
+from letter_timer import LetterTimer
+from leaderboard_store import open_leaderboard, format_rank, now_ts, ScoreWriter
+from word_sampler import DeckSampler, DECKS_FILE
+from wordpack import load_words, PACK_FILE
+from round_plan import build_plan
+from instrument import Tracer, Profiler, TRACE_FILE, PROFILE_FILE
+from replay import EventLog, EVENTS_FILE, GUESS, WORD, HINT, SKIP, TIMEOUT_EVENT, NEXT, PAUSE, RESUME
 
 # ---------------------------
 # CONFIG & DATA
 # ---------------------------
 LEADERBOARD_FILE = "leaderboard.txt"
+# point at a *.db file to share one SQLite leaderboard between several game instances
+LEADERBOARD_PATH = os.environ.get("GUESS_LEADERBOARD", LEADERBOARD_FILE)
+# host:port of a shared score_service.py; the local leaderboard stands in when it's down
+SCORE_SERVER = os.environ.get("GUESS_SCORE_SERVER")
+# every move of every game is appended here, for replays (set GUESS_EVENTS= to turn it off)
+EVENTS_PATH = os.environ.get("GUESS_EVENTS", EVENTS_FILE)
 MAX_LEADERBOARD = 1000
+SCORE_FSYNC_INTERVAL = 5.0  # seconds between fsyncs of the leaderboard
 LIVES_PER_WORD = 3
 LETTER_TIME_LIMIT = 30  # seconds per letter for medium/hard
 PASTEL_BG = "#fff8f0"
@@ -21,46 +43,68 @@ BUTTON_WIDTH = 20
 CORRECT_SOUND = "correct.mp3"
 WRONG_SOUND = "wrong.mp3"
 BG_MUSIC = "background.mp3"
+PREFETCH_AHEAD = 3  # words whose images are decoded ahead of the current one
+IMAGE_CACHE_BYTES = 32 * 1024 * 1024  # memory budget for decoded word images
+WORDS_PER_GAME = 10
+
+# images and sounds come from assets.bundle when present, loose files otherwise
+ASSETS = AssetSource()
+
+# each player works through a shuffled deck per mode, so words don't repeat
+# until every word of the mode has been seen (decks are kept in decks.jsonl)
+# words come from words.pack when it exists (built with wordpack.py), else dictionary.py
+WORDS_PATH = os.environ.get("GUESS_WORDS", PACK_FILE)
+WORDS = load_words(WORDS_PATH)
+LETTER_EMOJI_MAP, FALLBACK_EMOJI, WORD_IMAGES = WORDS.emoji, WORDS.fallback, WORDS.images
+WORD_DECKS = DeckSampler(WORDS.pool, os.environ.get("GUESS_DECKS", DECKS_FILE))
+# edits to the words and pictures are picked up between games (GUESS_RELOAD=0 turns that off)
+RELOAD_SECONDS = float(os.environ.get("GUESS_RELOAD", RELOAD_INTERVAL))
 
 # ---------------------------
 # Leaderboard helpers
 # ---------------------------
+LEADERBOARD = open_leaderboard(LEADERBOARD_PATH, MAX_LEADERBOARD, legacy_path=LEADERBOARD_FILE)
+if SCORE_SERVER:
+    from score_service import RemoteLeaderboard   # imported lazily: it pulls in asyncio
+    LEADERBOARD = RemoteLeaderboard(SCORE_SERVER, LEADERBOARD)
+
 def load_leaderboard():
-    if not os.path.exists(LEADERBOARD_FILE):
-        return {"Easy": [], "Medium": [], "Hard": []}
-    leaderboards = {"Easy": [], "Medium": [], "Hard": []}
-    with open(LEADERBOARD_FILE, "r", encoding="utf-8") as f:
-        for line in f:
-            parts = line.strip().split(" | ")
-            if len(parts) >= 3:
-                name, score, mode = parts[:3]
-                ts = parts[3] if len(parts) > 3 else ""
-                leaderboards[mode].append((name, int(score), mode, ts))
-    for mode in leaderboards:
-        leaderboards[mode].sort(key=lambda x: x[1], reverse=True)
-    return leaderboards
+    # served from an index (top-K file or SQLite), so the cost doesn't grow with history
+    return LEADERBOARD.load()
 
 def save_to_leaderboard(name, score, mode):
-    ts = datetime.now().strftime("%Y-%m-%d %H:%M")
-    with open(LEADERBOARD_FILE, "a", encoding="utf-8") as f:
-        f.write(f"{name} | {score} | {mode} | {ts}\n")
+    LEADERBOARD.add(name, score, mode)
+
+def player_rank(score, mode):
+    """(rank, total) of a score over the whole history of a mode"""
+    return LEADERBOARD.rank(mode, score)
 
 # ---------------------------
 # SOUND HELPER
 # ---------------------------
+# effects are decoded once and played on reserved channels; a wrong-answer
+# buzz may cut off a "correct" chime, never the other way round
+SOUNDS = SoundManager(ASSETS, priorities={WRONG_SOUND: 1, CORRECT_SOUND: 0})
+
 def play_sound(file):
-    try:
-        sound = pygame.mixer.Sound(file)
-        sound.play()
-    except:
-        print(f"Cannot play sound: {file}")
+    SOUNDS.play(file)
 
 # ---------------------------
 # GAME CLASS
 # ---------------------------
 class GuessTheLetterGame(tk.Tk):
-    def __init__(self):
-        super().__init__()
+    def __init__(self, measure_startup=False, timer_stats=False, tracer=None):
+        startup = StartupTimer()
+        startup.mark("imports done")
+        self.tracer = tracer
+        if tracer is not None:
+            self._install_tracing(tracer)
+        with startup.phase("tk window"):
+            super().__init__()
+        self.startup = startup
+        self.measure_startup = measure_startup
+        self.timer_stats = timer_stats
+        self.startup_done = threading.Event()
         self.title("Guess The First Letter")
         self.geometry("760x700")
         self.configure(bg=PASTEL_BG)
@@ -68,18 +112,24 @@ class GuessTheLetterGame(tk.Tk):
         # Game state
         self.player_name = ""
         self.mode = "Medium"
-        self.words_pool = []
         self.play_list = []
-        self.current_word_index = 0
-        self.current_letter_index = 0
-        self.score = 0
-        self.lives = LIVES_PER_WORD
-        self.hints_left = 3
-        self.word_start_time = None
+        self.plan = None        # every letter's options, emoji and display, built by start_game
+        # the rules live in the engine; this class draws it and feeds it clicks and timer ticks
+        self.engine = GameEngine(lives=LIVES_PER_WORD, time_limit=LETTER_TIME_LIMIT)
         self.timer_label = None
-        self.timer_job = None   # <-- track scheduled after job so we can cancel/reschedule
-
-        # UI elements
+        self.letter_timer = LetterTimer(self, self.engine, self._show_time, self._on_letter_timeout)
+        self.dialogs_open = 0   # dialogs that paused the letter clock
+        self.game_id = None     # idempotency key for the score submission
+        self.events = EventLog(EVENTS_PATH, clock=lambda: self.engine.clock()) if EVENTS_PATH else None
+
+        # Scores are written by a background thread
+        self.score_writer = ScoreWriter(LEADERBOARD, fsync_interval=SCORE_FSYNC_INTERVAL)
+
+        # UI elements (each screen is built once, on first use)
+        self.start_screen = None
+        self.game_screen = None
+        self.current_screen = None
+        self._pushed = {}        # widget -> options last pushed to Tk, see _set()
         self.name_entry = None
         self.mode_var = tk.StringVar(value="Medium")
         self.header_frame = None
@@ -95,41 +145,111 @@ class GuessTheLetterGame(tk.Tk):
         self.hint_button = None
         self.entry_field = None
         self.footer_frame = None
+        self.option_buttons = []
+        self.option_letters = []
+        self.heart_labels = []
+
+        # Images are decoded in the background once a game picks its words
+        self.word_images = ImagePrefetcher(WORD_IMAGES, cache=ImageCache(IMAGE_CACHE_BYTES), source=ASSETS)
+        # emoji are shown as pre-rendered images (emoji_cache/), as text until one is ready
+        self.emoji_images = EmojiCache()
+        self.reloader = ContentReloader(WORDS, ASSETS, self.word_images, WORDS_PATH,
+                                        interval=RELOAD_SECONDS) if RELOAD_SECONDS > 0 else None
+
+        # Draw the menu first; audio comes up in the background once it is on screen
+        with self.startup.phase("start screen"):
+            self.setup_start_screen()
+        self.after_idle(self._on_first_frame)
+
+    def _install_tracing(self, tracer):
+        """--trace: time the hot paths and count widget creations (nothing is wrapped otherwise)"""
+        tracer.install(self, ["check_guess", "check_entry_guess", "_advance_after_correct", "load_round_ui",
+                              "build_option_buttons", "next_word", "preload_word_images", "game_over"])
+        game_module = sys.modules[__name__]
+        tracer.install(game_module, ["play_sound", "load_leaderboard", "save_to_leaderboard"])
+        tracer.install(LEADERBOARD, ["add_many", "top", "rank", "load"], prefix="leaderboard.")
+        tracer.install(assets, ["load_image"])
+        for widget in (tk.Frame, tk.Label, tk.Button, tk.Entry, tk.Radiobutton, tk.Toplevel):
+            tracer.count_calls(widget, "__init__", f"widgets.{widget.__name__}")
+        # click -> Tk idle again, i.e. until the frame it caused has been drawn
+        check_guess = self.check_guess
+
+        def check_guess_to_frame(letter):
+            tracer.until_idle(self, "click_to_frame")
+            return check_guess(letter)
+        self.check_guess = check_guess_to_frame
 
-        # Images cache
-        self.word_images = {}
-        self.preload_word_images()
-
-        # Initialize pygame
-        pygame.mixer.init()
-        try:
-            pygame.mixer.music.load(BG_MUSIC)
-            pygame.mixer.music.set_volume(0.3)
-            pygame.mixer.music.play(-1)
-        except:
-            print("Background music file not found or error.")
-
-        self.setup_start_screen()
+    # ---------------------------
+    # STARTUP
+    # ---------------------------
+    def _on_first_frame(self):
+        self.startup.mark("first frame")
+        self.emoji_images.prefetch(all_emoji(LETTER_EMOJI_MAP, FALLBACK_EMOJI))
+        if self.reloader is not None:
+            self.reloader.start()
+        threading.Thread(target=self._init_in_background, name="startup", daemon=True).start()
+        if self.measure_startup:
+            self._wait_for_startup()
+
+    def _init_in_background(self):
+        with self.startup.phase("audio init"):
+            audio_ok = SOUNDS.init_audio()
+        if audio_ok:
+            with self.startup.phase("sound effects"):
+                SOUNDS.preload([CORRECT_SOUND, WRONG_SOUND])
+            with self.startup.phase("background music"):
+                SOUNDS.play_music(BG_MUSIC)
+        self.startup.mark("startup complete")
+        self.startup_done.set()
+
+    def _wait_for_startup(self):
+        # --measure-startup: report once everything is up, then quit
+        if not self.startup_done.is_set():
+            self.after(20, self._wait_for_startup)
+            return
+        print(self.startup.report())
+        print(f"Time to first frame: {self.startup.at('first frame'):.1f} ms")
+        self.destroy()
 
     # ---------------------------
     # Preload word images
     # ---------------------------
     def preload_word_images(self):
-        for word, image_path in WORD_IMAGES.items():
-            if os.path.exists(image_path):
-                try:
-                    img = Image.open(image_path)
-                    self.word_images[word.lower()] = img
-                except Exception as e:
-                    print(f"Failed to load {image_path}: {e}")
+        # only the current word and the next few; the pool decodes them off the Tk thread
+        start = self.engine.word_index
+        self.word_images.prefetch(self.play_list[start:start + 1 + PREFETCH_AHEAD])
+
+    # ---------------------------
+    # SCREENS (built once, then shown/hidden)
+    # ---------------------------
+    def _show_screen(self, screen):
+        if self.current_screen is screen:
+            return
+        if self.current_screen is not None:
+            self.current_screen.pack_forget()
+        screen.pack(fill="both", expand=True)
+        self.current_screen = screen
+
+    def _set(self, widget, **options):
+        """configure() only the options that changed since the last push to this widget"""
+        last = self._pushed.setdefault(widget, {})
+        changed = {k: v for k, v in options.items() if last.get(k) != v}
+        if changed:
+            widget.configure(**changed)
+            last.update(changed)
 
     # ---------------------------
     # START SCREEN
     # ---------------------------
     def setup_start_screen(self):
-        for w in self.winfo_children():
-            w.destroy()
-        box = tk.Frame(self, bg=PASTEL_BG)
+        self.cancel_timer_job()
+        if self.start_screen is None:
+            self._build_start_screen()
+        self._show_screen(self.start_screen)
+
+    def _build_start_screen(self):
+        self.start_screen = tk.Frame(self, bg=PASTEL_BG)
+        box = tk.Frame(self.start_screen, bg=PASTEL_BG)
         box.pack(pady=30)
 
         tk.Label(box, text="Guess The First Letter", font=("Montserrat", 28, "bold"), fg=SOFT_TEXT, bg=PASTEL_BG).pack(pady=(0, 10))
@@ -163,45 +283,75 @@ class GuessTheLetterGame(tk.Tk):
         if not name.isalpha():
             messagebox.showinfo("Invalid nickname", "Nickname must contain letters only!")
             return
+        mode = self.mode_var.get()
+        self.apply_reload()
+        self.begin_game(name, mode, WORD_DECKS.draw(name, mode, WORDS_PER_GAME), random.getrandbits(64))
+
+    def apply_reload(self):
+        """Swap in words and pictures edited since the last game (only ever between games)"""
+        global WORDS, LETTER_EMOJI_MAP, FALLBACK_EMOJI, WORD_IMAGES
+        update = self.reloader.take() if self.reloader is not None else None
+        if update is None:
+            return
+        WORDS = update.content
+        LETTER_EMOJI_MAP, FALLBACK_EMOJI, WORD_IMAGES = WORDS.emoji, WORDS.fallback, WORDS.images
+        WORD_DECKS.pool = WORDS.pool   # decks of a mode whose size changed start over
+        self.word_images.paths = WORD_IMAGES
+        self.word_images.source = update.assets
+        self.word_images.invalidate(update.images)
+        self.emoji_images.prefetch(all_emoji(LETTER_EMOJI_MAP, FALLBACK_EMOJI))
+        print(f"Reloaded words and pictures: modes {sorted(update.modes) or 'unchanged'}, "
+              f"{len(update.images)} cached pictures dropped")
+
+    def begin_game(self, name, mode, words, seed):
+        """Start a game on a given word list and plan seed (replays call this directly)"""
         self.player_name = name
-        self.mode = self.mode_var.get()
-        if self.mode == "Easy":
-            self.words_pool = EASY_WORDS.copy()
-        elif self.mode == "Medium":
-            self.words_pool = MEDIUM_WORDS.copy()
-        else:
-            self.words_pool = HARD_WORDS.copy()
-        self.play_list = random.sample(self.words_pool, 10)  # Random 10 words
-        self.current_word_index = 0
-        self.current_letter_index = 0
-        self.score = 0
-        self.lives = LIVES_PER_WORD
-        self.hints_left = 3
-        self.timer_job = None
+        self.mode = mode
+        self.play_list = words
+        self.plan = build_plan(mode, words, LETTER_EMOJI_MAP, FALLBACK_EMOJI, seed)
+        self.engine.start(mode, words, name)
+        self.dialogs_open = 0
+        if self.events is not None:
+            self.events.start(seed, mode, name, words, self.engine.lives_per_game,
+                              self.engine.hints_per_word, self.engine.time_limit)
+        self.game_id = uuid.uuid4().hex
         self.setup_game_ui()
 
     # ---------------------------
     # GAME UI
     # ---------------------------
     def setup_game_ui(self):
-        for w in self.winfo_children():
-            w.destroy()
+        if self.game_screen is None:
+            self._build_game_screen()
+        # the timer only shows in timed modes
+        if self.mode in ["Medium", "Hard"]:
+            self.timer_label.pack(side="right", padx=(0, 16), after=self.lives_frame)
+        else:
+            self.timer_label.pack_forget()
+        self._set(self.timer_label, text="")
+        self.entry_field.delete(0, tk.END)
+        self._show_screen(self.game_screen)
+        self.load_round_ui()
 
-        self.header_frame = tk.Frame(self, bg=PASTEL_BG)
+    def _build_game_screen(self):
+        self.game_screen = tk.Frame(self, bg=PASTEL_BG)
+
+        self.header_frame = tk.Frame(self.game_screen, bg=PASTEL_BG)
         self.header_frame.pack(fill="x", pady=10)
-        self.info_label = tk.Label(self.header_frame, text=self._info_text(), bg=PASTEL_BG, fg=SOFT_TEXT, font=("Helvetica", 12))
+        self.info_label = tk.Label(self.header_frame, text="", bg=PASTEL_BG, fg=SOFT_TEXT, font=("Helvetica", 12))
         self.info_label.pack(side="left", padx=16)
         self.lives_frame = tk.Frame(self.header_frame, bg=PASTEL_BG)
         self.lives_frame.pack(side="right", padx=16)
-        self.update_lives_display()
-
-        if self.mode in ["Medium", "Hard"]:
-            self.timer_label = tk.Label(self.header_frame, text="", bg=PASTEL_BG, fg="orange", font=("Helvetica", 14, "bold"))
-            self.timer_label.pack(side="right", padx=(0, 16))
-
-        self.game_frame = tk.Frame(self, bg=PASTEL_BG)
+        self.heart_labels = []
+        for _ in range(LIVES_PER_WORD):
+            heart = tk.Label(self.lives_frame, text="", font=("Helvetica", 24), bg=PASTEL_BG, fg="red")
+            heart.pack(side="left", padx=2)
+            self.heart_labels.append(heart)
+        self.timer_label = tk.Label(self.header_frame, text="", bg=PASTEL_BG, fg="orange", font=("Helvetica", 14, "bold"))
+
+        self.game_frame = tk.Frame(self.game_screen, bg=PASTEL_BG)
         self.game_frame.pack(pady=8, fill="both", expand=True)
-        self.word_label = tk.Label(self.game_frame, text=self._word_display(), bg=PASTEL_BG, fg=SOFT_TEXT, font=("Montserrat", 32, "bold"))
+        self.word_label = tk.Label(self.game_frame, text="", bg=PASTEL_BG, fg=SOFT_TEXT, font=("Montserrat", 32, "bold"))
         self.word_label.pack(pady=14)
 
         emoji_frame = tk.Frame(self.game_frame, bg="#ffffff", bd=2, relief="groove")
@@ -216,8 +366,17 @@ class GuessTheLetterGame(tk.Tk):
         self.hint_label = tk.Label(self.game_frame, text="", bg=PASTEL_BG, fg=SOFT_TEXT, font=("Helvetica", 12))
         self.hint_label.pack(pady=(6, 0))
 
+        # four option buttons, relabelled for every letter
         self.buttons_frame = tk.Frame(self.game_frame, bg=PASTEL_BG)
         self.buttons_frame.pack(pady=6)
+        self.option_letters = ["?"] * 4
+        self.option_buttons = []
+        for idx in range(4):
+            color = BUTTON_COLORS[idx % len(BUTTON_COLORS)]
+            btn = tk.Button(self.buttons_frame, text="", width=6, height=2, font=("Helvetica", 16, "bold"),
+                            bg=color, fg=SOFT_TEXT, command=lambda i=idx: self.check_guess(self.option_letters[i]))
+            btn.pack(side="left", padx=8, pady=6)
+            self.option_buttons.append(btn)
 
         entry_frame = tk.Frame(self.game_frame, bg=PASTEL_BG)
         entry_frame.pack(pady=10)
@@ -228,279 +387,243 @@ class GuessTheLetterGame(tk.Tk):
 
         hint_frame = tk.Frame(self.game_frame, bg=PASTEL_BG)
         hint_frame.pack(pady=5)
-        self.hint_button = tk.Button(hint_frame, text=f"Hint ({self.hints_left} left)", command=self.use_hint, font=("Helvetica", 11), bg="#fff3cd", fg=SOFT_TEXT, width=12)
+        self.hint_button = tk.Button(hint_frame, text="", command=self.use_hint, font=("Helvetica", 11), bg="#fff3cd", fg=SOFT_TEXT, width=12)
         self.hint_button.pack()
 
         self.next_button = tk.Button(self.game_frame, text="Skip", command=self.skip_word, font=("Helvetica", 12, "bold"), bg=BUTTON_COLORS[3], fg=SOFT_TEXT, width=12)
         self.next_button.pack(pady=10)
 
-        self.footer_frame = tk.Frame(self, bg=PASTEL_BG)
+        self.footer_frame = tk.Frame(self.game_screen, bg=PASTEL_BG)
         self.footer_frame.pack(side="bottom", pady=10)
         tk.Button(self.footer_frame, text="Quit to Menu", command=self.setup_start_screen, bg=BUTTON_COLORS[4], fg=SOFT_TEXT, width=BUTTON_WIDTH).pack(side="left", padx=8)
         tk.Button(self.footer_frame, text="Show Leaderboard", command=self.show_leaderboard, bg=BUTTON_COLORS[1], fg=SOFT_TEXT, width=BUTTON_WIDTH).pack(side="left", padx=8)
 
-        self.load_round_ui()
-
     # ---------------------------
     # HELPERS
     # ---------------------------
     def _info_text(self):
-        return f"Player: {self.player_name}   |   Score: {self.score}   |   Word: {self.current_word_index+1}/{len(self.play_list)}"
+        return f"Player: {self.player_name}   |   Score: {self.engine.score}   |   Word: {self.engine.word_index+1}/{len(self.play_list)}"
 
     def current_word(self):
-        if 0 <= self.current_word_index < len(self.play_list):
-            return self.play_list[self.current_word_index].upper()
-        return None
-
-    def _word_display(self):
-        w = self.current_word()
-        if not w:
-            return ""
-        displayed = [ch if i < self.current_letter_index else "_" for i, ch in enumerate(w)]
-        return " ".join(displayed)
-
-    def letter_for_current(self):
-        w = self.current_word()
-        if w and self.current_letter_index < len(w):
-            return w[self.current_letter_index]
-        return None
-
-    def emoji_for_letter(self, letter):
-        if not letter:
-            return FALLBACK_EMOJI
-        letter = letter.upper()
-        return random.choice(LETTER_EMOJI_MAP.get(letter, [FALLBACK_EMOJI]))
+        return self.engine.word()
+
+    def current_round(self):
+        """The planned LetterRound for the engine's current letter"""
+        return self.plan.round(self.engine.word_index, self.engine.letter_index)
+
+    def _show_round(self, rnd):
+        self._set(self.word_label, text=rnd.display)
+        photo = self.emoji_images.photo(rnd.emoji)
+        if photo is not None:
+            self._set(self.emoji_label, image=photo, text="")
+        else:
+            self._set(self.emoji_label, image="", text=rnd.emoji)
+        self.build_option_buttons(rnd)
 
     # ---------------------------
-    # TIMER (with job management)
+    # TIMER (one LetterTimer, ticking only when the shown seconds change)
     # ---------------------------
     def cancel_timer_job(self):
-        if self.timer_job is not None:
-            try:
-                self.after_cancel(self.timer_job)
-            except Exception:
-                pass
-            self.timer_job = None
-
-    def update_timer(self):
-        # Called every second when active; stores job id in self.timer_job
-        if not (self.mode in ["Medium", "Hard"] and self.word_start_time):
-            return
-        elapsed = (datetime.now() - self.word_start_time).total_seconds()
-        remaining = max(0, LETTER_TIME_LIMIT - elapsed)
-        mins, secs = divmod(int(remaining), 60)
-        if self.timer_label:
-            self.timer_label.config(text=f"⏰ {mins:01d}:{secs:02d}")
-
-        if remaining <= 0:
-            # time ran out for this letter -> penalize and advance
-            self.lives -= 1
-            self.update_lives_display()
-            play_sound(WRONG_SOUND)
-            if self.lives <= 0:
-                self.cancel_timer_job()
-                self.game_over()
-                return
-            # advance letter (skip this letter)
-            self.current_letter_index += 1
-            if self.current_letter_index >= len(self.current_word()):
-                # completed by timeout -> go next word
-                self.cancel_timer_job()
-                self.after(300, self.next_word)
-                return
-            # else reset timer and refresh UI for new letter
-            self.word_start_time = datetime.now()
-            self.load_round_ui()  # load_round_ui will restart timer
-            return
+        self.letter_timer.cancel()
+
+    def restart_timer(self):
+        self.letter_timer.start()
+
+    def _show_time(self, seconds_left):
+        mins, secs = divmod(seconds_left, 60)
+        self._set(self.timer_label, text=f"⏰ {mins:01d}:{secs:02d}")
 
-        # schedule next tick
-        self.timer_job = self.after(1000, self.update_timer)
+    def _record(self, kind, outcome=0, text=""):
+        if self.events is not None:
+            self.events.record(kind, outcome, text)
+
+    def _on_letter_timeout(self, outcome):
+        self._record(TIMEOUT_EVENT, outcome)
+        # time ran out for this letter -> the engine took a life and skipped the letter
+        self.update_lives_display()
+        play_sound(WRONG_SOUND)
+        if outcome == GAME_OVER:
+            self.game_over()
+        elif outcome == WORD_DONE:
+            self.after(300, self.next_word, self.engine.word_index)
+        else:
+            self.load_round_ui()  # load_round_ui will restart timer
 
     # ---------------------------
     # ROUND LOGIC
     # ---------------------------
-    def build_option_buttons(self, correct_letter):
-        # build buttons for the current letter
-        for w in self.buttons_frame.winfo_children():
-            w.destroy()
-        options = [correct_letter.upper()]
-        while len(options) < 4:
-            cand = random.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ")
-            if cand not in options:
-                options.append(cand)
-        random.shuffle(options)
-
-        for idx, opt in enumerate(options):
-            color = BUTTON_COLORS[idx % len(BUTTON_COLORS)]
-            btn = tk.Button(self.buttons_frame, text=opt, width=6, height=2, font=("Helvetica", 16, "bold"),
-                            bg=color, fg=SOFT_TEXT, command=lambda c=opt: self.check_guess(c))
-            btn.pack(side="left", padx=8, pady=6)
+    def build_option_buttons(self, rnd):
+        # relabel the existing buttons with the planned options
+        self.option_letters[:] = rnd.options
+        for btn, opt in zip(self.option_buttons, rnd.options):
+            self._set(btn, text=opt)
 
     def update_lives_display(self):
-        for w in self.lives_frame.winfo_children():
-            w.destroy()
-        for i in range(LIVES_PER_WORD):
-            heart = "❤️" if i < self.lives else "💔"
-            tk.Label(self.lives_frame, text=heart, font=("Helvetica", 24), bg=PASTEL_BG, fg="red").pack(side="left", padx=2)
+        for i, label in enumerate(self.heart_labels):
+            self._set(label, text="❤️" if i < self.engine.lives else "💔")
 
     def load_round_ui(self):
         # cancel any existing timer job before loading new UI
         self.cancel_timer_job()
 
-        if self.current_word_index >= len(self.play_list):
+        if self.engine.finished:
             self.game_over()
             return
 
+        self.preload_word_images()
+
         # reset hint label (do not overwrite player info)
-        self.hint_label.config(text="")
-
-        self.word_label.config(text=self._word_display())
-        letter = self.letter_for_current()
-        # update emoji to correspond to current letter
-        self.emoji_label.config(text=self.emoji_for_letter(letter))
-        # build option buttons for current letter
-        self.build_option_buttons(letter if letter else "?")
+        self._set(self.hint_label, text="")
+
+        # word, emoji and option buttons for the current letter
+        self._show_round(self.current_round())
         self.update_lives_display()
-        self.info_label.config(text=self._info_text())
+        self._set(self.info_label, text=self._info_text())
+        # hints reset per word (3 per word)
+        self._set(self.hint_button, text=f"Hint ({self.engine.hints_left} left)")
 
         # start / reset timer for the letter
-        self.word_start_time = datetime.now()
-        if self.mode in ["Medium", "Hard"]:
-            # ensure timer job is started
-            self.cancel_timer_job()
-            self.update_timer()
-
-        # hints reset per word (3 per word)
-        self.hints_left = 3
-        self.hint_button.config(text=f"Hint ({self.hints_left} left)")
+        self.restart_timer()
 
     # ---------------------------
     # GUESS LOGIC
     # ---------------------------
-    def _advance_after_correct(self):
-        """Advance to next letter/word after a correct guess."""
+    def _advance_after_correct(self, outcome):
+        """Show the next letter, or move to the next word once this one is finished."""
         # cancel current timer job (we'll restart it if needed)
         self.cancel_timer_job()
-
-        self.current_letter_index += 1
-        self.score += 0  # score increment handled where necessary (your existing logic adds 1)
-        if self.current_letter_index >= len(self.current_word()):
+        if outcome == WORD_DONE:
             # finished word -> go to next word automatically
-            self.after(300, self.next_word)
+            self.after(300, self.next_word, self.engine.word_index)
             return
-        # not finished -> update display for next letter
-        self.word_label.config(text=self._word_display())
-        # update emoji for the new current letter
-        letter = self.letter_for_current()
-        self.emoji_label.config(text=self.emoji_for_letter(letter))
-        # rebuild choice buttons for new letter
-        self.build_option_buttons(letter if letter else "?")
+        # not finished -> show the next letter's round
+        self._show_round(self.current_round())
         # restart timer for new letter
-        self.word_start_time = datetime.now()
-        if self.mode in ["Medium", "Hard"]:
+        self.restart_timer()
+
+    def _after_wrong(self, outcome):
+        self.update_lives_display()
+        play_sound(WRONG_SOUND)
+        if outcome == GAME_OVER:
             self.cancel_timer_job()
-            self.update_timer()
+            self.game_over()
 
     def check_guess(self, choice_letter):
-        correct = self.letter_for_current()
-        if correct is None:
-            return
-        if choice_letter.upper() == correct.upper():
+        outcome = self.engine.guess(choice_letter)
+        self._record(GUESS, outcome, choice_letter)
+        if outcome in (CORRECT, WORD_DONE):
             play_sound(CORRECT_SOUND)
-            # give score per correct letter (keeps your previous +1 behavior)
-            self.score += 1
             # use helper to advance safely (updates emoji, buttons, timer)
-            self._advance_after_correct()
+            self._advance_after_correct(outcome)
             # update info text after scoring
-            self.info_label.config(text=self._info_text())
-        else:
-            self.lives -= 1
-            self.update_lives_display()
-            play_sound(WRONG_SOUND)
-            if self.lives <= 0:
-                self.cancel_timer_job()
-                self.game_over()
+            self._set(self.info_label, text=self._info_text())
+        elif outcome != IGNORED:
+            self._after_wrong(outcome)
 
     def check_entry_guess(self):
-        guess = self.entry_field.get().strip().upper()
+        guess = self.entry_field.get().strip()
         self.entry_field.delete(0, tk.END)
-        if not guess.isalpha():
-            return
         if len(guess) == 1:
             self.check_guess(guess)
             return
-        # full word guess: calculate per-letter deduction as before
-        word = self.current_word()
-        # normalize both to upper
-        word_u = word.upper()
-        wrong_count = 0
-        for i, ch in enumerate(word_u):
-            if i >= len(guess) or guess[i] != ch:
-                wrong_count += 1
-        # deduct for wrong letters
-        self.score = max(0, self.score - wrong_count)
-        # if fully correct, award remaining letters
-        if guess == word_u:
-            # award letters not yet guessed
-            gained = len(word_u) - self.current_letter_index
-            if gained > 0:
-                self.score += gained
+        # full word guess: the engine deducts one point per wrong letter
+        outcome = self.engine.guess_word(guess)
+        self._record(WORD, outcome, guess)
+        if outcome == WORD_DONE:
             # mark as finished and go next
             self.cancel_timer_job()
-            self.after(300, self.next_word)
-            return
-        else:
+            self.after(300, self.next_word, self.engine.word_index)
+        elif outcome != IGNORED:
             # wrong full guess penalizes a life too
-            self.lives -= 1
-            self.update_lives_display()
-            play_sound(WRONG_SOUND)
-            if self.lives <= 0:
-                self.cancel_timer_job()
-                self.game_over()
-                return
-            # if still alive, continue on same letter (timer continues)
-            # update info label but do NOT overwrite player name - place message in hint label
-            self.hint_label.config(text=f"Wrong guess (-{wrong_count})")
-            # no automatic advance here
+            self._after_wrong(outcome)
+            if outcome == WRONG:
+                # if still alive, continue on same letter (timer continues)
+                self._set(self.hint_label, text=f"Wrong guess (-{self.engine.last_penalty})")
 
     # ---------------------------
     # HINT
     # ---------------------------
     def use_hint(self):
-        if self.hints_left <= 0:
+        letter = self.engine.hint()
+        if letter is None:
             return
-        self.hints_left -= 1
-        letter = self.letter_for_current()
+        self._record(HINT, CORRECT, letter)
         # show hint between emoji and choices
-        self.hint_label.config(text=f"Hint: {letter}")
-        self.hint_button.config(text=f"Hint ({self.hints_left} left)")
+        self._set(self.hint_label, text=f"Hint: {letter}")
+        self._set(self.hint_button, text=f"Hint ({self.engine.hints_left} left)")
 
     # ---------------------------
     # SKIP
     # ---------------------------
     def skip_word(self):
         # skipping simply advances to the next word (skipped words do not return)
+        outcome = self.engine.skip()
+        if outcome == IGNORED:
+            return
+        self._record(SKIP, outcome)
         self.cancel_timer_job()
-        self.after(200, self.next_word)
+        self.after(200, self.next_word, self.engine.word_index)
 
-    def next_word(self):
+    def next_word(self, word_index=None):
         # move to next word; reset letter index and UI
-        self.current_word_index += 1
-        self.current_letter_index = 0
-        # cancel any timer job before loading
+        if self.current_screen is not self.game_screen:
+            return  # player went back to the menu while the word was finishing
+        if not self.engine.waiting or (word_index is not None and word_index != self.engine.word_index):
+            return  # already moved on (a replay or a new game got there first)
         self.cancel_timer_job()
+        self.engine.next_word()
+        self._record(NEXT)
         self.load_round_ui()
 
     # ---------------------------
     # GAME OVER
     # ---------------------------
     def game_over(self):
-        save_to_leaderboard(self.player_name, self.score, self.mode)
-        lb = load_leaderboard()
-        lb_mode = lb[self.mode][:5]
-        lb_text = "\n".join([f"{i + 1}. {e[0]} - {e[1]}pts" for i, e in enumerate(lb_mode)]) if lb_mode else "No scores yet"
-        messagebox.showinfo("Game Over", f"Player: {self.player_name}\nScore: {self.score}\nMode: {self.mode}\n\nTop Scores:\n{lb_text}")
+        name, score, mode = self.player_name, self.engine.score, self.mode
+        if not self.score_writer.submit(self.game_id, (name, score, mode, now_ts())):
+            return  # this game's score was already submitted
+        if self.events is not None:
+            self.events.end(score, self.engine.word_index)
         self.setup_start_screen()
+        # the query runs after our own write, so top 5 and rank include this game
+        self.query_leaderboard(lambda store: (store.top(mode, 5), store.rank(mode, score)),
+                               lambda result: self._show_game_over(name, score, mode, result))
+
+    def _show_game_over(self, name, score, mode, result):
+        lb_mode, rank = result or ([], (1, 1))
+        lb_text = "\n".join([f"{i + 1}. {e[0]} - {e[1]}pts" for i, e in enumerate(lb_mode)]) if lb_mode else "No scores yet"
+        rank_text = format_rank(*rank)
+        messagebox.showinfo("Game Over", f"Player: {name}\nScore: {score}\nMode: {mode}\nYou placed {rank_text}\n\nTop Scores:\n{lb_text}")
+
+    # ---------------------------
+    # BACKGROUND LEADERBOARD ACCESS
+    # ---------------------------
+    def query_leaderboard(self, fn, callback):
+        """Run fn(store) on the score writer thread, then callback(result) on the Tk thread"""
+        results = queue.Queue()
+        self.score_writer.query(fn, results.put)
+        self._poll_result(results, callback)
+
+    def _poll_result(self, results, callback):
+        try:
+            result = results.get_nowait()
+        except queue.Empty:
+            self.after(30, self._poll_result, results, callback)
+            return
+        callback(result)
+
+    def destroy(self):
+        # flush queued scores before the window (and usually the process) goes away
+        self.score_writer.close()
+        if self.events is not None:
+            self.events.close()
+        self.word_images.shutdown()
+        self.emoji_images.shutdown()
+        if self.reloader is not None:
+            self.reloader.stop()
+        if self.timer_stats:
+            print(f"Letter timer wake-up jitter: {self.letter_timer.jitter_stats()}")
+        super().destroy()
 
     # ---------------------------
     # INSTRUCTIONS & LEADERBOARD
@@ -517,7 +640,25 @@ class GuessTheLetterGame(tk.Tk):
         messagebox.showinfo("Instructions", instructions)
 
     def show_leaderboard(self):
-        lb = load_leaderboard()
+        # the letter clock stops while the leaderboard is open mid-game; the window
+        # is modal, so no option can be picked while the clock stands still
+        self.pause_for_dialog()
+        self.query_leaderboard(lambda store: store.load(), self._show_leaderboard_window)
+
+    def pause_for_dialog(self):
+        if self.dialogs_open == 0 and self.current_screen is self.game_screen:
+            self.letter_timer.pause()
+            self._record(PAUSE)
+        self.dialogs_open += 1
+
+    def resume_after_dialog(self):
+        self.dialogs_open = max(0, self.dialogs_open - 1)
+        if self.dialogs_open == 0 and self.current_screen is self.game_screen:
+            self.letter_timer.resume()
+            self._record(RESUME)
+
+    def _show_leaderboard_window(self, lb):
+        lb = lb or {"Easy": [], "Medium": [], "Hard": []}
         text = ""
         for mode in ["Easy", "Medium", "Hard"]:
             text += f"{mode} Top 5:\n"
@@ -531,14 +672,35 @@ class GuessTheLetterGame(tk.Tk):
         top.title("Leaderboards")
         top.configure(bg=PASTEL_BG)
         top.geometry("500x600")
+        top.transient(self)
         tk.Label(top, text="All Mode Leaderboards", font=("Helvetica", 16, "bold"), bg=PASTEL_BG, fg=SOFT_TEXT).pack(pady=8)
         tk.Label(top, text=text, font=("Helvetica", 11), bg=PASTEL_BG, fg=SOFT_TEXT, justify="left").pack(padx=12, pady=8)
-        tk.Button(top, text="Close", command=top.destroy, bg=BUTTON_COLORS[0], fg=SOFT_TEXT, width=BUTTON_WIDTH).pack(pady=8)
+        def close():
+            top.destroy()
+            self.resume_after_dialog()
+        top.protocol("WM_DELETE_WINDOW", close)
+        tk.Button(top, text="Close", command=close, bg=BUTTON_COLORS[0], fg=SOFT_TEXT, width=BUTTON_WIDTH).pack(pady=8)
+        top.wait_visibility()
+        top.grab_set()
 
 
 # ---------------------------
 # RUN
 # ---------------------------
 if __name__ == "__main__":
-    app = GuessTheLetterGame()
-    app.mainloop()
+    # --trace / GUESS_TRACE=file: Chrome trace of the hot paths on exit
+    # --profile / GUESS_PROFILE=file: cProfile of the whole session
+    trace_path = os.environ.get("GUESS_TRACE") or (TRACE_FILE if "--trace" in sys.argv else None)
+    profile_path = os.environ.get("GUESS_PROFILE") or (PROFILE_FILE if "--profile" in sys.argv else None)
+    tracer = Tracer() if trace_path else None
+    app = GuessTheLetterGame(measure_startup="--measure-startup" in sys.argv,
+                             timer_stats="--timer-stats" in sys.argv, tracer=tracer)
+    if profile_path:
+        with Profiler(profile_path).running():
+            app.mainloop()
+    else:
+        app.mainloop()
+    if tracer is not None:
+        tracer.save(trace_path)
+        print(tracer.report())
+        print(f"Trace written to {trace_path}")
@@ -0,0 +1,429 @@
+# analytics.py
+# Per-player and per-day statistics over the whole score history:
+#   python analytics.py players                 (games, best and mean per mode, trend)
+#   python analytics.py player Ana
+#   python analytics.py days --mode Hard
+#   python analytics.py info
+# The log is kept as NumPy columns in a cache next to it (leaderboard.txt.npz),
+# so each run only parses what was appended since the last one.  Rows the
+# leaderboard's compaction dropped are read back from leaderboard.txt.archive.
+import os
+import sys
+import time
+import sqlite3
+import argparse
+import calendar
+from collections import Counter
+import numpy as np
+from leaderboard_store import MODES, SQLITE_SUFFIXES, ARCHIVE_SUFFIX, parse_line
+
+LEADERBOARD_FILE = "leaderboard.txt"
+LEADERBOARD_PATH = os.environ.get("GUESS_LEADERBOARD", LEADERBOARD_FILE)
+CACHE_SUFFIX = ".npz"
+CHUNK = 8 * 1024 * 1024    # bytes of log parsed at a time
+SIGNATURE_BYTES = 64       # log bytes just before the cached offset, to spot a rewritten log
+MODE_CODES = {m: i for i, m in enumerate(MODES)}
+DAY = 86400
+
+# ---------------------------
+# Columnar history
+# ---------------------------
+class ScoreHistory:
+    """Every recorded score as parallel NumPy columns, one row per game.
+
+    player  int32  index into names (names are stored once each)
+    score   int32
+    mode    int8   index into MODES
+    ts      int64  seconds since the epoch, taken as written; -1 when missing
+    game    int32  how many games the player had already played in that mode
+
+    The columns are cached in an .npz file together with the log's size,
+    mtime and how far it was read.  refresh() leaves an unchanged log alone
+    and parses only the appended tail of a grown one.  Compaction rewrites
+    the log with its best rows and moves the rest to the archive, so after
+    a rewrite the log and the archive's new tail are matched against the
+    rows read from the log before (the live rows): what neither accounts
+    for is new, and nothing is counted twice or lost.  A SQLite leaderboard
+    is read like the log, with the last row id as the offset; its -wal file
+    counts as part of it, since new rows sit there until a checkpoint.
+    """
+
+    def __init__(self, path=LEADERBOARD_PATH, cache_path=None):
+        self.path = path
+        self.cache_path = cache_path if cache_path is not None else path + CACHE_SUFFIX
+        self.archive_path = path + ARCHIVE_SUFFIX
+        self.sqlite = path.lower().endswith(SQLITE_SUFFIXES)
+        self._reset()
+        self._load_cache()
+
+    def _reset(self):
+        self.names = []
+        self.codes = {}
+        self.player = np.zeros(0, np.int32)
+        self.score = np.zeros(0, np.int32)
+        self.mode = np.zeros(0, np.int8)
+        self.ts = np.zeros(0, np.int64)
+        self.game = np.zeros(0, np.int32)
+        self.played = []   # games so far per player * len(MODES) + mode
+        self.offset = 0
+        self.archive_offset = 0
+        self.live = np.zeros(0, np.int64)   # rows that are still in the log (not archived)
+        self.signature = b""
+        self.stat = None
+
+    def __len__(self):
+        return len(self.score)
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        stat = (st.st_size, st.st_mtime_ns)
+        if self.sqlite:
+            try:
+                wal = os.stat(self.path + "-wal")
+                stat += (wal.st_size, wal.st_mtime_ns)
+            except OSError:
+                stat += (0, 0)
+        return stat
+
+    def _archive_size(self):
+        try:
+            return os.path.getsize(self.archive_path)
+        except OSError:
+            return 0
+
+    # ----- cache -----
+    def _load_cache(self):
+        try:
+            with np.load(self.cache_path) as data:
+                if str(data["source"]) != os.path.abspath(self.path):
+                    return
+                names = data["names"].tolist()
+                self.player, self.score = data["player"], data["score"]
+                self.mode, self.ts, self.game = data["mode"], data["ts"], data["game"]
+                self.offset = int(data["offset"])
+                self.archive_offset = int(data["archive_offset"])
+                self.live = data["live"]
+                self.signature = data["signature"].tobytes()
+                self.stat = tuple(int(x) for x in data["stat"])
+        except (OSError, KeyError, ValueError):
+            self._reset()
+            return
+        self.names = names
+        self.codes = {name: i for i, name in enumerate(names)}
+        self.played = np.bincount(self.keys(), minlength=len(names) * len(MODES)).tolist()
+
+    def keys(self):
+        """Group key of every row: player * len(MODES) + mode"""
+        return self.player.astype(np.intp) * len(MODES) + self.mode
+
+    def _save_cache(self):
+        tmp = self.cache_path + ".tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, source=np.array(os.path.abspath(self.path)),
+                     names=np.array(self.names, dtype=str), player=self.player, score=self.score,
+                     mode=self.mode, ts=self.ts, game=self.game, offset=np.array(self.offset, np.int64),
+                     archive_offset=np.array(self.archive_offset, np.int64), live=self.live,
+                     signature=np.frombuffer(self.signature, np.uint8),
+                     stat=np.array(self.stat or (0, 0), np.int64))
+        os.replace(tmp, self.cache_path)
+
+    # ----- ingest -----
+    def refresh(self):
+        """Bring the columns up to date with the log, return the number of new rows"""
+        stat = self._stat()
+        if stat is None:
+            self._reset()
+            return 0
+        if stat == self.stat:
+            return 0
+        before = len(self)
+        if self.sqlite:
+            self._ingest_sqlite()
+        elif (stat[0] < self.offset or self._read_signature() != self.signature
+              or self._archive_size() > self.archive_offset):
+            self._reconcile()   # log compacted behind us
+        else:
+            self._ingest_text()
+            self.live = np.concatenate([self.live, np.arange(before, len(self), dtype=np.int64)])
+        self.stat = stat
+        self._save_cache()
+        return len(self) - before
+
+    def _read_signature(self):
+        start = max(0, self.offset - SIGNATURE_BYTES)
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            return f.read(self.offset - start)
+
+    def _append(self, player, score, mode, ts, game):
+        self.player = np.concatenate([self.player, np.array(player, np.int32)])
+        self.score = np.concatenate([self.score, np.array(score, np.int32)])
+        self.mode = np.concatenate([self.mode, np.array(mode, np.int8)])
+        self.ts = np.concatenate([self.ts, np.array(ts, np.int64)])
+        self.game = np.concatenate([self.game, np.array(game, np.int32)])
+
+    def _columns(self, entries):
+        """(name, score, mode, ts) rows -> lists of column values, for _append"""
+        codes, names, played = self.codes, self.names, self.played
+        n_modes = len(MODES)
+        seconds = {"": -1}
+        player, score, mode, ts, game = [], [], [], [], []
+        for name, points, mode_name, stamp in entries:
+            code = codes.get(name)
+            if code is None:
+                code = codes[name] = len(names)
+                names.append(name)
+                played.extend([0] * n_modes)
+            t = seconds.get(stamp)
+            if t is None:
+                t = seconds[stamp] = parse_ts(stamp)
+            m = MODE_CODES[mode_name]
+            key = code * n_modes + m
+            player.append(code)
+            score.append(points)
+            mode.append(m)
+            ts.append(t)
+            game.append(played[key])
+            played[key] += 1
+        return player, score, mode, ts, game
+
+    def _ingest_text(self):
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            while True:
+                chunk = f.read(CHUNK)
+                end = chunk.rfind(b"\n") + 1
+                if not end:
+                    break   # nothing, or only a half-written last line
+                if end < len(chunk):
+                    f.seek(end - len(chunk), os.SEEK_CUR)
+                lines = chunk[:end].decode("utf-8", errors="replace").splitlines()
+                self._append(*self._columns(e for e in map(parse_line, lines) if e))
+                self.offset += end
+        self.signature = self._read_signature()
+
+    def _read_entries(self, path, start):
+        """Parsed rows of a text log from byte start on, and where its last complete line ends"""
+        entries = []
+        end = start
+        try:
+            with open(path, "rb") as f:
+                f.seek(start)
+                for raw in f:
+                    if not raw.endswith(b"\n"):
+                        break   # half-written line, picked up next time
+                    end += len(raw)
+                    entry = parse_line(raw.decode("utf-8", errors="replace"))
+                    if entry:
+                        entries.append(entry)
+        except OSError:
+            pass
+        return entries, end
+
+    def _reconcile(self):
+        """After a compaction: add what the rewritten log and the archive hold that wasn't read yet.
+
+        Rows are matched by (name, score, mode, time); rows alike in all
+        four are interchangeable for every statistic, so a multiset match
+        is enough.  Live rows still in the log stay live, live rows gone
+        from it are the ones now in the archive, and whatever is left of
+        either file is new: those were all appended after the last refresh,
+        so they go after every row already read, in time order.
+        """
+        log, offset = self._read_entries(self.path, 0)
+        archived, archive_end = self._read_entries(self.archive_path, self.archive_offset)
+        seconds = {}
+
+        def key(entry):
+            t = seconds.get(entry[3])
+            if t is None:
+                t = seconds[entry[3]] = parse_ts(entry[3])
+            return (entry[0], entry[1], entry[2], t)
+        in_log = Counter(map(key, log))
+        gone = Counter()
+        live = []
+        rows = zip(self.live.tolist(), self.player[self.live].tolist(), self.score[self.live].tolist(),
+                   self.mode[self.live].tolist(), self.ts[self.live].tolist())
+        for i, player, score, mode, t in rows:
+            k = (self.names[player], score, MODES[mode], t)
+            if in_log[k]:
+                in_log[k] -= 1
+                live.append(i)
+            else:
+                gone[k] += 1
+        fresh = []   # (entry, still in the log)
+        for entry in archived:
+            k = key(entry)
+            if gone[k]:
+                gone[k] -= 1
+            else:
+                fresh.append((entry, False))
+        for entry in log:
+            k = key(entry)
+            if in_log[k]:
+                in_log[k] -= 1
+                fresh.append((entry, True))
+        fresh.sort(key=lambda item: seconds[item[0][3]])
+        before = len(self)
+        self._append(*self._columns(entry for entry, _ in fresh))
+        live.extend(before + i for i, (_, still) in enumerate(fresh) if still)
+        self.live = np.array(sorted(live), np.int64)
+        self.offset = offset
+        self.archive_offset = archive_end
+        self.signature = self._read_signature()
+
+    def _ingest_sqlite(self):
+        conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+        try:
+            cur = conn.execute("SELECT id, name, score, mode, ts FROM scores WHERE id > ? ORDER BY id",
+                               (self.offset,))
+            while True:
+                rows = cur.fetchmany(200000)
+                if not rows:
+                    break
+                self._append(*self._columns(r[1:] for r in rows))
+                self.offset = rows[-1][0]
+        finally:
+            conn.close()
+
+def parse_ts(stamp):
+    """'YYYY-MM-DD HH:MM' -> seconds since the epoch (the clock time as written), -1 if unusable"""
+    try:
+        return calendar.timegm(time.strptime(stamp.strip(), "%Y-%m-%d %H:%M"))
+    except ValueError:
+        return -1
+
+def open_history(path=LEADERBOARD_PATH):
+    """A ScoreHistory that is already up to date"""
+    history = ScoreHistory(path)
+    history.refresh()
+    return history
+
+# ---------------------------
+# Group-bys
+# ---------------------------
+def _group_sums(keys, values, size):
+    return np.bincount(keys, weights=values, minlength=size)
+
+def player_stats(history):
+    """Per (player, mode) aggregates as arrays indexed [player, mode].
+
+    games, best (-1 where never played), mean, and trend: the slope of a
+    least-squares line through the player's scores in game order, in
+    points per game (0 with fewer than two games).
+    """
+    n_players, n_modes = len(history.names), len(MODES)
+    size = n_players * n_modes
+    keys = history.keys()
+    score = history.score
+    games = np.bincount(keys, minlength=size)
+    total = _group_sums(keys, score, size)
+    best = np.full(size, -1, score.dtype)
+    np.maximum.at(best, keys, score)
+    # x is the game number, so sum(x) and sum(x^2) over a group have closed forms
+    sx = games * (games - 1) / 2
+    sxx = (games - 1) * games * (2 * games - 1) / 6
+    sxy = _group_sums(keys, history.game * score.astype(np.float64), size)
+    denom = games * sxx - sx * sx
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.where(games > 0, total / games, 0.0)
+        trend = np.where(denom > 0, (games * sxy - sx * total) / denom, 0.0)
+    shape = (n_players, n_modes)
+    return {"games": games.reshape(shape), "best": best.reshape(shape),
+            "mean": mean.reshape(shape), "trend": trend.reshape(shape)}
+
+def daily_stats(history, mode=None):
+    """Per-day aggregates: (days as datetime64[D], games, distinct players, mean score, best score).
+
+    Only days with games are returned; rows without a timestamp are left out.
+    """
+    keep = history.ts >= 0
+    if mode is not None:
+        keep &= history.mode == MODE_CODES[mode]
+    if not keep.any():
+        empty = np.zeros(0, np.int64)
+        return empty.astype("datetime64[D]"), empty, empty, np.zeros(0), empty
+    day = history.ts[keep] // DAY
+    first = day.min()
+    day = (day - first).astype(np.intp)   # dense: a few thousand days at most
+    span = int(day.max()) + 1
+    score = history.score[keep]
+    games = np.bincount(day, minlength=span)
+    total = _group_sums(day, score, span)
+    best = np.full(span, -1, score.dtype)
+    np.maximum.at(best, day, score)
+    n_players = len(history.names)
+    pairs = day * n_players + history.player[keep]
+    if span * n_players <= 1 << 27:
+        seen = np.zeros(span * n_players, bool)
+        seen[pairs] = True
+        players = seen.reshape(span, n_players).sum(axis=1)
+    else:
+        players = np.bincount(np.unique(pairs) // n_players, minlength=span)
+    active = np.flatnonzero(games)
+    days = (active + first).astype("datetime64[D]")
+    return days, games[active], players[active], total[active] / games[active], best[active]
+
+# ---------------------------
+# CLI
+# ---------------------------
+def _print_player_rows(history, stats, rows):
+    print(f"{'player':<16} " + " ".join(f"{m + ' games/best/mean/trend':>32}" for m in MODES))
+    for p in rows:
+        cells = []
+        for m in range(len(MODES)):
+            if stats["games"][p, m]:
+                cells.append(f"{stats['games'][p, m]:>9} {stats['best'][p, m]:>6} "
+                             f"{stats['mean'][p, m]:>7.2f} {stats['trend'][p, m]:>+8.3f}")
+            else:
+                cells.append(f"{'-':>32}")
+        print(f"{history.names[p]:<16} " + " ".join(cells))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Player and per-day statistics over the score history")
+    parser.add_argument("--log", default=LEADERBOARD_PATH, help="leaderboard .txt or .db")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("players", help="every player, most games first")
+    p.add_argument("-n", type=int, default=50)
+    p = sub.add_parser("player", help="one player (case-insensitive)")
+    p.add_argument("name")
+    p = sub.add_parser("days", help="games, players and scores per day")
+    p.add_argument("-m", "--mode", choices=MODES)
+    p.add_argument("-n", type=int, default=30, help="most recent days shown")
+    sub.add_parser("info", help="size of the history and how long a refresh took")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    history = ScoreHistory(args.log)
+    added = history.refresh()
+    loaded = time.perf_counter() - start
+    if args.command == "info":
+        print(f"{len(history):,} games by {len(history.names):,} players, {added:,} new since the cache "
+              f"({loaded * 1000:.1f} ms)")
+        start = time.perf_counter()
+        player_stats(history)
+        daily_stats(history)
+        print(f"player and day group-bys: {(time.perf_counter() - start) * 1000:.1f} ms")
+    elif args.command in ("players", "player"):
+        stats = player_stats(history)
+        if args.command == "player":
+            wanted = args.name.lower()
+            rows = [i for i, name in enumerate(history.names) if name.lower() == wanted]
+            if not rows:
+                print(f"No games by {args.name}")
+                return 1
+        else:
+            rows = np.argsort(-stats["games"].sum(axis=1), kind="stable")[:args.n]
+        _print_player_rows(history, stats, rows)
+    else:
+        days, games, players, mean, best = daily_stats(history, args.mode)
+        print(f"{'day':<12} {'games':>7} {'players':>8} {'mean':>7} {'best':>5}")
+        for i in range(max(0, len(days) - args.n), len(days)):
+            print(f"{str(days[i]):<12} {games[i]:>7} {players[i]:>8} {mean[i]:>7.2f} {best[i]:>5}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+# asset_bundle.py
+import os
+import io
+import sys
+import glob
+import json
+import mmap
+import struct
+import hashlib
+
+BASE_DIR = getattr(sys, "_MEIPASS", os.path.dirname(os.path.abspath(__file__)))
+BUNDLE_FILE = "assets.bundle"
+MAGIC = b"GTLBNDL1"
+_HEADER = struct.Struct("<8sI")   # magic, length of the JSON index that follows
+CHUNK = 1024 * 1024
+
+# ---------------------------
+# Bundle format
+# ---------------------------
+# [magic][index length][JSON index: name -> [offset, length, sha256]][data...]
+# Offsets are relative to the first data byte.  Names are file basenames,
+# so "images/cat.jpg" and "cat.jpg" both find the same entry.
+
+def build_bundle(out_path, files):
+    """Pack files into one bundle, return the number of entries written"""
+    index = {}
+    offset = 0
+    for path in files:
+        h = hashlib.sha256()
+        length = 0
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(CHUNK), b""):
+                h.update(chunk)
+                length += len(chunk)
+        index[os.path.basename(path)] = [offset, length, h.hexdigest()]
+        offset += length
+    header = json.dumps(index, separators=(",", ":")).encode("utf-8")
+    tmp = out_path + ".tmp"
+    with open(tmp, "wb") as out:
+        out.write(_HEADER.pack(MAGIC, len(header)))
+        out.write(header)
+        for path in files:
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(CHUNK), b""):
+                    out.write(chunk)
+    os.replace(tmp, out_path)
+    return len(index)
+
+class _BundleFile(io.RawIOBase):
+    """Read-only file object over one entry of the mapped bundle (for PIL / pygame)"""
+
+    def __init__(self, mm, start, length):
+        super().__init__()
+        self._mm = mm
+        self._start = start
+        self._length = length
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += self._length
+        self._pos = min(max(0, offset), self._length)
+        return self._pos
+
+    def read(self, n=-1):
+        end = self._length if n is None or n < 0 else min(self._length, self._pos + n)
+        data = self._mm[self._start + self._pos:self._start + end]
+        self._pos = end
+        return data
+
+    def readinto(self, buf):
+        # straight from the mapping into buf, with no bytes object in between
+        start = self._start + self._pos
+        with memoryview(buf) as view, view.cast("B") as dst, memoryview(self._mm) as src:
+            n = max(0, min(len(dst), self._length - self._pos))
+            dst[:n] = src[start:start + n]
+        self._pos += n
+        return n
+
+class AssetBundle:
+    """A bundle file mapped into memory; entries are served straight from the mapping"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, header_len = _HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC:
+            self.mm.close()
+            raise ValueError(f"{path} is not an asset bundle")
+        self.data_start = _HEADER.size + header_len
+        self.index = json.loads(self.mm[_HEADER.size:self.data_start].decode("utf-8"))
+        if hasattr(self.mm, "madvise"):
+            # one sequential read-ahead of the whole file instead of many small reads
+            self.mm.madvise(mmap.MADV_WILLNEED)
+
+    def __contains__(self, name):
+        return os.path.basename(name) in self.index
+
+    def view(self, name):
+        """Zero-copy memoryview of an entry"""
+        offset, length, _ = self.index[os.path.basename(name)]
+        start = self.data_start + offset
+        return memoryview(self.mm)[start:start + length]
+
+    def open(self, name):
+        offset, length, _ = self.index[os.path.basename(name)]
+        return _BundleFile(self.mm, self.data_start + offset, length)
+
+    def verify(self):
+        """Names of entries whose contents don't match their stored hash"""
+        bad = []
+        for name, (_, _, digest) in self.index.items():
+            view = self.view(name)
+            if hashlib.sha256(view).hexdigest() != digest:
+                bad.append(name)
+            view.release()
+        return bad
+
+    def close(self):
+        self.mm.close()
+
+# ---------------------------
+# Asset lookup with loose-file fallback
+# ---------------------------
+class AssetSource:
+    """Open assets from the bundle when there is one, else from loose files"""
+
+    def __init__(self, bundle_path=BUNDLE_FILE, base_dir=BASE_DIR):
+        self.base_dir = base_dir
+        self.bundle = None
+        path = bundle_path if os.path.isabs(bundle_path) else os.path.join(base_dir, bundle_path)
+        if os.path.exists(path):
+            try:
+                self.bundle = AssetBundle(path)
+            except (OSError, ValueError) as e:
+                print(f"Ignoring asset bundle {path}: {e}")
+
+    def _loose_path(self, path):
+        for candidate in (path, os.path.join(self.base_dir, path),
+                          os.path.join(self.base_dir, os.path.basename(path))):
+            if os.path.isfile(candidate):
+                return candidate
+        return None
+
+    def exists(self, path):
+        return (self.bundle is not None and path in self.bundle) or self._loose_path(path) is not None
+
+    def version(self, path):
+        """Something that changes when the asset does: the bundle's hash, or a loose file's mtime and size"""
+        if self.bundle is not None and path in self.bundle:
+            return self.bundle.index[os.path.basename(path)][2]
+        loose = self._loose_path(path)
+        if loose is None:
+            return None
+        st = os.stat(loose)
+        return (st.st_mtime_ns, st.st_size)
+
+    def open(self, path):
+        """Binary file object for an asset; raises FileNotFoundError if it is nowhere"""
+        if self.bundle is not None and path in self.bundle:
+            return self.bundle.open(path)
+        loose = self._loose_path(path)
+        if loose is None:
+            raise FileNotFoundError(path)
+        return open(loose, "rb")
+
+if __name__ == "__main__":
+    # python asset_bundle.py build [out.bundle] [files...]   (default: every *.jpg / *.mp3 here)
+    # python asset_bundle.py verify [bundle]
+    args = sys.argv[1:]
+    if args and args[0] == "build":
+        out = args[1] if len(args) > 1 else os.path.join(BASE_DIR, BUNDLE_FILE)
+        files = args[2:] or sorted(glob.glob(os.path.join(BASE_DIR, "*.jpg")) + glob.glob(os.path.join(BASE_DIR, "*.mp3")))
+        print(f"Wrote {build_bundle(out, files)} assets to {out}")
+    elif args and args[0] == "verify":
+        bundle = AssetBundle(args[1] if len(args) > 1 else os.path.join(BASE_DIR, BUNDLE_FILE))
+        bad = bundle.verify()
+        print("OK" if not bad else "Corrupt entries: " + ", ".join(bad))
+        bundle.close()
+        sys.exit(1 if bad else 0)
+    else:
+        print("usage: asset_bundle.py build [out] [files...] | verify [bundle]")
@@ -0,0 +1,175 @@
+# assets.py
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from asset_bundle import AssetSource
+
+IMAGE_BOX = (300, 180)   # size of the picture box in the game screen
+PREFETCH_WORKERS = 2
+IMAGE_CACHE_BYTES = 32 * 1024 * 1024
+
+# ---------------------------
+# Image loading
+# ---------------------------
+def load_image(fp, size=IMAGE_BOX):
+    """Decode an image (path or binary file object) already scaled down to fit size"""
+    from PIL import Image  # imported lazily, only the prefetch threads need it
+    img = Image.open(fp)
+    img.draft("RGB", size)   # JPEG: let the decoder skip most of the full-size work
+    img.thumbnail(size)
+    img.load()
+    return img
+
+def image_nbytes(img):
+    return img.width * img.height * len(img.getbands())
+
+# ---------------------------
+# Display-size image cache
+# ---------------------------
+class ImageCache:
+    """LRU cache of downscaled images keyed by (word, size), bounded in bytes.
+
+    The PhotoImage for an entry is made on first use from the Tk thread and
+    counted against the same budget.  Evicted PhotoImages are only released
+    from photo(), so Tk objects are never freed on a worker thread.
+    """
+
+    def __init__(self, max_bytes=IMAGE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()   # (word, size) -> [image, nbytes, photo]
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+        self._released = []
+
+    def __contains__(self, key):
+        with self.lock:
+            return key in self.entries
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, img):
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old:
+                self.nbytes -= old[1]
+                self._released.append(old[2])
+            size = image_nbytes(img)
+            self.entries[key] = [img, size, None]
+            self.nbytes += size
+            self._evict()
+
+    def discard(self, key):
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old:
+                self.nbytes -= old[1]
+                self._released.append(old[2])
+
+    def keys(self):
+        with self.lock:
+            return list(self.entries)
+
+    def photo(self, key):
+        """PhotoImage for a cached image (Tk thread only), or None on a miss"""
+        with self.lock:
+            self._released.clear()
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.entries.move_to_end(key)
+            if entry[2] is None:
+                from PIL import ImageTk
+                entry[2] = ImageTk.PhotoImage(entry[0])
+                extra = entry[0].width * entry[0].height * 4
+                entry[1] += extra
+                self.nbytes += extra
+                self._evict(keep=key)
+            return entry[2]
+
+    def _evict(self, keep=None):
+        while self.nbytes > self.max_bytes and len(self.entries) > 1:
+            key, entry = next(iter(self.entries.items()))
+            if key == keep:
+                break
+            del self.entries[key]
+            self.nbytes -= entry[1]
+            self.evictions += 1
+            self._released.append(entry[2])
+
+    def stats(self):
+        with self.lock:
+            return {"entries": len(self.entries), "bytes": self.nbytes, "max_bytes": self.max_bytes,
+                    "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+# ---------------------------
+# Background prefetch
+# ---------------------------
+class ImagePrefetcher:
+    """Decode word images on a small thread pool ahead of when they're shown.
+
+    prefetch() and get() are cheap and never block, so they can be called
+    from the Tk thread; get() just returns None until the image is ready.
+    """
+
+    def __init__(self, paths, size=IMAGE_BOX, workers=PREFETCH_WORKERS, cache=None, source=None):
+        self.paths = paths   # lower-case word -> path (a dict, or a word pack's ImageMap)
+        self.source = source if source is not None else AssetSource()
+        self.size = size
+        self.cache = cache if cache is not None else ImageCache()
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="image-prefetch")
+
+    def prefetch(self, words):
+        for word in words:
+            word = word.lower()
+            with self.lock:
+                if word in self.pending or word not in self.paths or (word, self.size) in self.cache:
+                    continue
+                self.pending[word] = self.pool.submit(self._load, word)
+
+    def _load(self, word):
+        path = self.paths[word]
+        img = None
+        if self.source.exists(path):
+            try:
+                with self.source.open(path) as f:   # decoded by now; don't keep a handle per cached image
+                    img = load_image(f, self.size)
+            except Exception as e:
+                print(f"Failed to load {path}: {e}")
+        if img is not None:
+            self.cache.put((word, self.size), img)
+        with self.lock:
+            self.pending.pop(word, None)
+        return img
+
+    def get(self, word):
+        return self.cache.get((word.lower(), self.size))
+
+    def cached_words(self):
+        return [word for word, size in self.cache.keys() if size == self.size]
+
+    def invalidate(self, words):
+        """Drop these words' decoded images, so the next prefetch reads them again"""
+        for word in words:
+            self.cache.discard((word.lower(), self.size))
+
+    def photo(self, word):
+        """PhotoImage of a prefetched word (Tk thread only), None if not decoded yet"""
+        return self.cache.photo((word.lower(), self.size))
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,227 @@
+# benchmark.py
+# Benchmarks of the game's hot paths, headless:
+#   python benchmark.py                                   (results to benchmark.json)
+#   python benchmark.py --baseline bench_baseline.json    (exit 1 on a regression)
+#   python benchmark.py --update-baseline bench_baseline.json
+#   python benchmark.py --only leaderboard --sizes 1000 100000
+#   xvfb-run -a python benchmark.py --only ui             (the Tk benchmarks need a display)
+# Sound runs on SDL's dummy audio driver; every file the game would write
+# goes to a scratch directory.
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import itertools
+import platform
+import tempfile
+import types
+from instrument import percentile
+
+RESULTS_FILE = "benchmark.json"
+SIZES = (1000, 100000, 1000000)
+THRESHOLD = 0.25       # allowed slowdown against the baseline (0.25 = 25%)
+NOISE_MS = 0.05        # differences below this are never regressions
+GROUPS = ("leaderboard", "images", "sound", "sampling", "ui")
+
+# ---------------------------
+# Timing
+# ---------------------------
+def summarize(times):
+    """median / p99 / mean in ms of a list of durations in seconds"""
+    ms = sorted(t * 1000 for t in times)
+    return {"n": len(ms), "median_ms": round(percentile(ms, 0.5), 4),
+            "p99_ms": round(percentile(ms, 0.99), 4),
+            "mean_ms": round(sum(ms) / len(ms), 4)}
+
+def measure(fn, repeat, setup=None):
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return summarize(times)
+
+# ---------------------------
+# Benchmarks
+# ---------------------------
+# Each takes the game module and the parsed args and returns {name: summary}.
+
+def bench_leaderboard(game, args):
+    from leaderboard_store import open_leaderboard, format_line, INDEX_SUFFIX, MODES
+    rng = random.Random(1)
+    results = {}
+    for n in args.sizes:
+        path = os.path.join(args.scratch, f"leaderboard_{n}.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            for start in range(0, n, 10000):
+                f.write("".join(format_line(f"kid{rng.randrange(5000)}", rng.randrange(60), rng.choice(MODES),
+                                            "2026-01-01 10:00") for _ in range(min(10000, n - start))))
+
+        def cold():
+            # a kiosk starting up on a log whose index was lost
+            if os.path.exists(path + INDEX_SUFFIX):
+                os.remove(path + INDEX_SUFFIX)
+            game.LEADERBOARD = open_leaderboard(path, game.MAX_LEADERBOARD)
+        results[f"load_leaderboard.cold.{n}"] = measure(game.load_leaderboard, 3 if n < 1000000 else 1, cold)
+        results[f"load_leaderboard.warm.{n}"] = measure(game.load_leaderboard, 50)
+        # stays under the store's compaction interval, so every call is a plain append
+        results[f"save_to_leaderboard.{n}"] = measure(
+            lambda: game.save_to_leaderboard(f"kid{rng.randrange(5000)}", rng.randrange(60), "Medium"), 200)
+        os.remove(path)
+    return results
+
+def bench_images(game, args):
+    from assets import ImagePrefetcher, ImageCache
+    words = list(itertools.islice(game.WORD_IMAGES, 40))
+    if not words:
+        return {}
+    rng = random.Random(3)
+    prefetcher = ImagePrefetcher(game.WORD_IMAGES, source=game.ASSETS)
+    stub = types.SimpleNamespace(engine=types.SimpleNamespace(word_index=0), play_list=words,
+                                 word_images=prefetcher)
+    preload = lambda: game.GuessTheLetterGame.preload_word_images(stub)
+
+    def wait():
+        with stub.word_images.lock:
+            futures = list(stub.word_images.pending.values())
+        for f in futures:
+            f.result()
+
+    def cold():
+        wait()
+        prefetcher.cache = ImageCache(game.IMAGE_CACHE_BYTES)
+        stub.engine.word_index = rng.randrange(len(words))
+    # .cold: until the window of words is decoded; .call: what the Tk thread itself spends
+    results = {"preload_word_images.cold": measure(lambda: (preload(), wait()), 20, cold),
+               "preload_word_images.call": measure(preload, 20, cold)}
+    wait()
+    results["preload_word_images.warm"] = measure(lambda: (preload(), wait()), 200)
+    prefetcher.shutdown()
+    return results
+
+def bench_sound(game, args):
+    if not game.SOUNDS.init_audio():
+        return {}
+    game.SOUNDS.preload([game.CORRECT_SOUND, game.WRONG_SOUND])
+    sounds = itertools.cycle([game.CORRECT_SOUND, game.WRONG_SOUND])
+    return {"play_sound": measure(lambda: game.play_sound(next(sounds)), 500)}
+
+def bench_sampling(game, args):
+    from round_plan import build_plan
+    rng = random.Random(2)
+
+    def start():
+        # what start_game() does before the first round is drawn
+        mode = rng.choice(("Easy", "Medium", "Hard"))
+        words = game.WORD_DECKS.draw(f"kid{rng.randrange(50)}", mode, game.WORDS_PER_GAME)
+        build_plan(mode, words, game.LETTER_EMOJI_MAP, game.FALLBACK_EMOJI, rng.getrandbits(64))
+    return {"start_game.sampling": measure(start, 300)}
+
+def bench_ui(game, args):
+    import tkinter as tk
+    try:
+        app = game.GuessTheLetterGame()
+    except tk.TclError as e:
+        print(f"  skipped: no display for Tk ({e}); run under xvfb-run")
+        return {}
+    try:
+        app.update()
+        app.begin_game("bench", "Medium", game.WORD_DECKS.draw("bench", "Medium", game.WORDS_PER_GAME), 1)
+        app.update()
+        rounds = [(wi, li, rnd) for wi, word in enumerate(app.plan.words) for li, rnd in enumerate(word.letters)]
+        cycle = itertools.cycle(rounds)
+
+        def next_letter():
+            wi, li, rnd = next(cycle)
+            app.engine.word_index, app.engine.letter_index = wi, li
+            return rnd
+
+        def build():
+            app.build_option_buttons(next_letter())
+            app.update_idletasks()
+
+        def load():
+            next_letter()
+            app.load_round_ui()
+            app.update_idletasks()
+        return {"build_option_buttons": measure(build, 300), "load_round_ui": measure(load, 300)}
+    finally:
+        app.destroy()
+
+BENCHMARKS = {"leaderboard": bench_leaderboard, "images": bench_images, "sound": bench_sound,
+              "sampling": bench_sampling, "ui": bench_ui}
+
+# ---------------------------
+# Baseline comparison
+# ---------------------------
+def compare(results, baseline, threshold=THRESHOLD):
+    """(name, baseline ms, new ms, ratio) of every benchmark that slowed down by more than threshold"""
+    regressions = []
+    for name, new in results.items():
+        old = baseline.get(name)
+        if old is None:
+            continue
+        before, after = old["median_ms"], new["median_ms"]
+        if after > before * (1 + threshold) and after - before > NOISE_MS:
+            regressions.append((name, before, after, after / before if before else float("inf")))
+    return regressions
+
+def _load_game(scratch):
+    # everything the game writes goes to the scratch dir, as in replay.play_in_window
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    os.environ["GUESS_LEADERBOARD"] = os.path.join(scratch, "leaderboard.txt")
+    os.environ["GUESS_DECKS"] = os.path.join(scratch, "decks.jsonl")
+    os.environ["GUESS_EVENTS"] = ""
+    os.environ.pop("GUESS_SCORE_SERVER", None)
+    import Guesstheletter2
+    return Guesstheletter2
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the game's hot paths")
+    parser.add_argument("--only", nargs="+", choices=GROUPS, help="benchmark groups to run (default: all)")
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(SIZES), help="leaderboard lines")
+    parser.add_argument("--out", default=RESULTS_FILE)
+    parser.add_argument("--baseline", help="results file to compare against")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="allowed slowdown (0.25 = 25%%)")
+    parser.add_argument("--update-baseline", metavar="FILE", help="also write the results here")
+    args = parser.parse_args(argv)
+
+    args.scratch = tempfile.mkdtemp(prefix="guessbench")
+    try:
+        game = _load_game(args.scratch)
+        results = {}
+        for group in args.only or GROUPS:
+            print(f"{group}...")
+            results.update(BENCHMARKS[group](game, args))
+    finally:
+        shutil.rmtree(args.scratch, ignore_errors=True)
+
+    print(f"{'benchmark':<36} {'n':>5} {'median ms':>10} {'p99 ms':>10}")
+    for name, s in results.items():
+        print(f"{name:<36} {s['n']:>5} {s['median_ms']:>10.4f} {s['p99_ms']:>10.4f}")
+    report = {"meta": {"python": platform.python_version(), "platform": platform.platform(),
+                       "cpus": os.cpu_count(), "when": time.strftime("%Y-%m-%d %H:%M:%S")},
+              "results": results}
+    for path in filter(None, (args.out, args.update_baseline)):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    print(f"Results written to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        for name, before, after, ratio in regressions:
+            print(f"REGRESSION {name}: {before:.4f} ms -> {after:.4f} ms ({ratio:.2f}x)")
+        if regressions:
+            return 1
+        print(f"No regressions over {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+# emoji_cache.py
+# Emoji rendered once to small images, so showing one is a cheap image swap
+# instead of Tk rasterizing a 64 pt colour glyph (slow, especially through
+# font fallback on Linux).
+#   python emoji_cache.py build        (render every emoji of the word list ahead of time)
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+EMOJI_PX = 96            # rendered box, about what Tk draws for a 64 pt emoji
+CACHE_DIR = "emoji_cache"
+EMOJI_WORKERS = 1
+# colour emoji fonts (Windows, macOS, Linux); GUESS_EMOJI_FONT goes first when set
+EMOJI_FONTS = [p for p in (os.environ.get("GUESS_EMOJI_FONT"),
+                           "seguiemj.ttf",
+                           "/System/Library/Fonts/Apple Color Emoji.ttc",
+                           "/usr/share/fonts/truetype/noto/NotoColorEmoji.ttf",
+                           "/usr/share/fonts/noto/NotoColorEmoji.ttf",
+                           "/usr/share/fonts/google-noto-emoji/NotoColorEmoji.ttf",
+                           "NotoColorEmoji.ttf") if p]
+BITMAP_SIZES = (109, 160, 136, 96, 64)   # fixed strikes of bitmap emoji fonts (Noto, Apple)
+MISSING = "\U0010FFFD"   # never in a font: renders as the font's "no glyph" box
+
+# ---------------------------
+# Rendering
+# ---------------------------
+def emoji_key(emoji):
+    """File-name-safe key: code points in hex, '-' separated"""
+    return "-".join(f"{ord(ch):x}" for ch in emoji)
+
+def find_font(px=EMOJI_PX, candidates=None):
+    """The first colour emoji font that loads, or None"""
+    from PIL import ImageFont  # imported lazily, only the worker thread needs it
+    for path in EMOJI_FONTS if candidates is None else candidates:
+        for size in (px,) + BITMAP_SIZES:
+            try:
+                return ImageFont.truetype(path, size)
+            except OSError:
+                continue   # missing font, or a size a bitmap font doesn't have
+    return None
+
+def _draw(text, font):
+    from PIL import Image, ImageDraw
+    box = font.getbbox(text, mode="RGBA")
+    if box[2] <= box[0] or box[3] <= box[1]:
+        return None
+    img = Image.new("RGBA", (box[2] - box[0], box[3] - box[1]), (0, 0, 0, 0))
+    ImageDraw.Draw(img).text((-box[0], -box[1]), text, font=font, fill="black", embedded_color=True)
+    return img
+
+def render_emoji(emoji, font, px=EMOJI_PX, missing=None):
+    """RGBA image of an emoji scaled to fit px x px, None if the font has no glyph for it.
+
+    missing is _draw(MISSING, font), passed in so it is drawn once per font.
+    """
+    from PIL import Image, features
+    text = emoji.replace("\ufe0f", "")   # colour fonts pick emoji presentation anyway
+    if len(text) > 1 and not features.check("raqm"):
+        return None   # ZWJ / skin tone sequences need complex layout; leave those to Tk
+    img = _draw(text, font)
+    if img is None:
+        return None
+    if missing is not None and img.size == missing.size and img.tobytes() == missing.tobytes():
+        return None
+    img.thumbnail((px, px), Image.LANCZOS)
+    return img
+
+# ---------------------------
+# Cache (memory + disk)
+# ---------------------------
+class EmojiCache:
+    """Emoji images kept in memory and as PNGs under cache_dir/<px>/.
+
+    prefetch() hands emoji to a background worker, which loads each from
+    disk or renders and saves it; photo() is cheap and never blocks, and
+    returns None (show the emoji as text) until the image is ready, or for
+    good if no emoji font could draw it.  PhotoImages are made on first
+    use from the Tk thread.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, px=EMOJI_PX, fonts=None, workers=EMOJI_WORKERS):
+        self.dir = os.path.join(cache_dir, str(px))
+        self.px = px
+        self.fonts = fonts
+        self.images = {}    # emoji -> PIL image, or None if it can't be drawn
+        self.photos = {}    # emoji -> PhotoImage
+        self.pending = set()
+        self.lock = threading.Lock()
+        self._font = None
+        self._missing = None
+        self._font_checked = False
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="emoji-cache")
+
+    def path(self, emoji):
+        return os.path.join(self.dir, emoji_key(emoji) + ".png")
+
+    def prefetch(self, emojis):
+        for emoji in emojis:
+            with self.lock:
+                if emoji in self.images or emoji in self.pending:
+                    continue
+                self.pending.add(emoji)
+            self.pool.submit(self._load, emoji)
+
+    def _font_for_rendering(self):
+        if not self._font_checked:
+            self._font_checked = True
+            self._font = find_font(self.px, self.fonts)
+            if self._font is not None:
+                self._missing = _draw(MISSING, self._font)
+        return self._font
+
+    def _load(self, emoji):
+        img = None
+        path = self.path(emoji)
+        try:
+            if os.path.exists(path):
+                from PIL import Image
+                img = Image.open(path)
+                img.load()
+            else:
+                font = self._font_for_rendering()
+                if font is not None:
+                    img = render_emoji(emoji, font, self.px, self._missing)
+                if img is not None:
+                    os.makedirs(self.dir, exist_ok=True)
+                    tmp = path + ".tmp"
+                    img.save(tmp, "PNG")
+                    os.replace(tmp, path)
+        except Exception as e:
+            print(f"Failed to render emoji {emoji_key(emoji)}: {e}")
+        with self.lock:
+            self.images[emoji] = img
+            self.pending.discard(emoji)
+        return img
+
+    def get(self, emoji):
+        with self.lock:
+            return self.images.get(emoji)
+
+    def photo(self, emoji):
+        """PhotoImage of a cached emoji (Tk thread only), None if there is none (yet)"""
+        photo = self.photos.get(emoji)
+        if photo is None:
+            img = self.get(emoji)
+            if img is None:
+                return None
+            from PIL import ImageTk
+            photo = self.photos[emoji] = ImageTk.PhotoImage(img)
+        return photo
+
+    def wait(self):
+        """Block until everything prefetched so far is loaded"""
+        self.pool.submit(lambda: None).result()
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+def all_emoji(emoji_map, fallback):
+    """Every emoji a round can show, in first-seen order"""
+    return list(dict.fromkeys([e for letter in sorted(emoji_map) for e in emoji_map[letter]] + [fallback]))
+
+if __name__ == "__main__":
+    # python emoji_cache.py build [cache_dir]
+    if len(sys.argv) < 2 or sys.argv[1] != "build":
+        print("usage: python emoji_cache.py build [cache_dir]")
+        sys.exit(2)
+    from wordpack import load_words, PACK_FILE
+    words = load_words(os.environ.get("GUESS_WORDS", PACK_FILE))
+    cache = EmojiCache(sys.argv[2] if len(sys.argv) > 2 else CACHE_DIR)
+    emojis = all_emoji(words.emoji, words.fallback)
+    if cache._font_for_rendering() is None:
+        print("No colour emoji font found; set GUESS_EMOJI_FONT to one")
+        sys.exit(1)
+    cache.prefetch(emojis)
+    cache.wait()
+    drawn = sum(cache.get(e) is not None for e in emojis)
+    print(f"{drawn} of {len(emojis)} emoji rendered to {cache.dir}")
+    cache.shutdown()
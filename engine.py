@@ -0,0 +1,195 @@
+# engine.py
+import time
+
+LIVES_PER_GAME = 3
+HINTS_PER_WORD = 3
+LETTER_TIME_LIMIT = 30   # seconds per letter for medium/hard
+TIMED_MODES = ("Medium", "Hard")
+ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+# ---------------------------
+# Move outcomes
+# ---------------------------
+IGNORED = 0     # nothing to guess right now (word finished, game over, bad input)
+CORRECT = 1     # right letter, same word continues
+WRONG = 2       # a life was lost, same letter continues
+TIMEOUT = 3     # time ran out: a life was lost and the letter was skipped
+WORD_DONE = 4   # the word is finished; call next_word() to move on
+GAME_OVER = 5   # no lives left
+
+# ---------------------------
+# Headless game rules
+# ---------------------------
+class GameEngine:
+    """All of the game's rules, with no window, sound or timers attached.
+
+    The clock is injectable, so simulations and tests can step
+    through games as fast as Python allows.  Words are stored upper-case.
+    After WORD_DONE the engine ignores guesses until next_word() is called;
+    the window waits a moment there so the finished word stays visible.
+    """
+
+    __slots__ = ("clock", "lives_per_game", "hints_per_word", "time_limit",
+                 "mode", "player", "words", "word_index", "letter_index",
+                 "score", "lives", "hints_left", "deadline", "paused_at", "waiting", "over", "last_penalty")
+
+    def __init__(self, clock=time.monotonic, lives=LIVES_PER_GAME,
+                 hints=HINTS_PER_WORD, time_limit=LETTER_TIME_LIMIT):
+        self.clock = clock
+        self.lives_per_game = lives
+        self.hints_per_word = hints
+        self.time_limit = time_limit
+        self.start("Easy", [])
+
+    def start(self, mode, words, player=""):
+        self.mode = mode
+        self.player = player
+        self.words = [w.upper() for w in words]
+        self.word_index = 0
+        self.letter_index = 0
+        self.score = 0
+        self.lives = self.lives_per_game
+        self.hints_left = self.hints_per_word
+        self.waiting = False
+        self.over = not self.words
+        self.last_penalty = 0
+        self.deadline = None
+        self.paused_at = None
+        self._restart_clock()
+
+    # ----- state -----
+    @property
+    def timed(self):
+        return self.mode in TIMED_MODES
+
+    @property
+    def finished(self):
+        return self.word_index >= len(self.words)
+
+    def word(self):
+        if 0 <= self.word_index < len(self.words):
+            return self.words[self.word_index]
+        return None
+
+    def letter(self):
+        w = self.word()
+        if w and self.letter_index < len(w):
+            return w[self.letter_index]
+        return None
+
+    def display(self):
+        w = self.word()
+        if not w:
+            return ""
+        return " ".join(ch if i < self.letter_index else "_" for i, ch in enumerate(w))
+
+    def remaining(self):
+        if self.deadline is None:
+            return 0.0
+        now = self.paused_at if self.paused_at is not None else self.clock()
+        return max(0.0, self.deadline - now)
+
+    def _restart_clock(self):
+        now = self.clock()
+        self.deadline = now + self.time_limit if self.timed and not self.over else None
+        if self.paused_at is not None:
+            self.paused_at = now
+
+    def pause(self):
+        """Stop the letter clock (e.g. while a dialog is open)"""
+        if self.paused_at is None:
+            self.paused_at = self.clock()
+
+    def resume(self):
+        if self.paused_at is not None:
+            if self.deadline is not None:
+                self.deadline += self.clock() - self.paused_at
+            self.paused_at = None
+
+    def _lose_life(self):
+        self.lives -= 1
+        if self.lives <= 0:
+            self.over = True
+            self.deadline = None
+            return True
+        return False
+
+    def _finish_word(self):
+        self.waiting = True
+        self.deadline = None
+        return WORD_DONE
+
+    # ----- moves -----
+    def guess(self, letter):
+        """Pick an option letter; anything but a single letter is ignored"""
+        if self.over or self.waiting or len(letter) != 1 or not letter.isalpha():
+            return IGNORED
+        correct = self.letter()
+        if correct is None:
+            return IGNORED
+        if letter.upper() != correct:
+            return GAME_OVER if self._lose_life() else WRONG
+        self.score += 1
+        self.letter_index += 1
+        if self.letter_index >= len(self.words[self.word_index]):
+            return self._finish_word()
+        self._restart_clock()
+        return CORRECT
+
+    def guess_word(self, text):
+        """Typed guess: one letter works like guess(); a full word scores or costs per letter"""
+        text = text.strip().upper()
+        if not text.isalpha():
+            return IGNORED
+        if len(text) == 1:
+            return self.guess(text)
+        if self.over or self.waiting or self.word() is None:
+            return IGNORED
+        word = self.words[self.word_index]
+        wrong = sum(1 for i, ch in enumerate(word) if i >= len(text) or text[i] != ch)
+        self.last_penalty = wrong
+        self.score = max(0, self.score - wrong)
+        if text == word:
+            self.score += len(word) - self.letter_index
+            return self._finish_word()
+        return GAME_OVER if self._lose_life() else WRONG
+
+    def hint(self):
+        """Spend a hint, return the letter it reveals (None if none left)"""
+        if self.hints_left <= 0 or self.over or self.waiting:
+            return None
+        self.hints_left -= 1
+        return self.letter()
+
+    def skip(self):
+        if self.over or self.waiting:
+            return IGNORED
+        return self._finish_word()
+
+    def tick(self):
+        """Apply the letter timeout if its deadline has passed"""
+        if self.deadline is None or self.paused_at is not None or self.clock() < self.deadline:
+            return IGNORED
+        if self._lose_life():
+            return GAME_OVER
+        self.letter_index += 1
+        if self.letter_index >= len(self.words[self.word_index]):
+            return self._finish_word()
+        self.hints_left = self.hints_per_word
+        self._restart_clock()
+        return TIMEOUT
+
+    def next_word(self):
+        """Move on after WORD_DONE; returns False when the word list is used up"""
+        if self.over:
+            return False
+        self.word_index += 1
+        self.letter_index = 0
+        self.hints_left = self.hints_per_word
+        self.waiting = False
+        if self.finished:
+            self.over = True
+            self.deadline = None
+            return False
+        self._restart_clock()
+        return True
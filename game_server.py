@@ -0,0 +1,341 @@
+# game_server.py
+# Hosts many players in one process for browsers / thin clients.
+#   python game_server.py serve --port 8766
+#   python game_server.py load --clients 1000 --games 3
+#
+# Protocol: one JSON object per line over TCP.  Requests get exactly one
+# reply, in order; timeouts arrive on their own as {"event": "timeout", ...}.
+#   {"op": "start", "name": "Ana", "mode": "Medium"}
+#   {"op": "guess", "letter": "C"}     an option button
+#   {"op": "type", "text": "cat"}      the entry field (a letter or the whole word)
+#   {"op": "hint"} / {"op": "skip"} / {"op": "stats"}
+# Every reply and event carries the round to draw: word, emoji, options,
+# image, score, lives, hints and seconds left.
+import os
+import sys
+import json
+import math
+import time
+import random
+import asyncio
+import argparse
+from engine import GameEngine, IGNORED, CORRECT, WRONG, TIMEOUT, WORD_DONE, GAME_OVER
+from leaderboard_store import open_leaderboard, now_ts, ScoreWriter
+from word_sampler import DeckSampler
+from wordpack import load_words, PACK_FILE
+from round_plan import build_plan
+from instrument import percentile
+
+DEFAULT_PORT = 8766
+WORDS_PER_GAME = 10
+LIVES_PER_WORD = 3
+LETTER_TIME_LIMIT = 30
+WHEEL_TICK = 0.05      # timer wheel resolution (seconds)
+WHEEL_SLOTS = 1024     # one lap = 51.2 s, longer than any letter deadline
+# the server's own leaderboard, so load tests never write to the game's leaderboard.txt
+SCORES_FILE = "server_leaderboard.txt"
+OUTCOME_NAMES = {IGNORED: "ignored", CORRECT: "correct", WRONG: "wrong", TIMEOUT: "timeout",
+                 WORD_DONE: "word_done", GAME_OVER: "game_over"}
+
+# ---------------------------
+# Timer wheel
+# ---------------------------
+class TimerWheel:
+    """Hashed timer wheel: O(1) to schedule, and each tick only looks at one slot.
+
+    Entries are never cancelled; whoever fires them checks whether they
+    are still current (see Session.timer_gen).
+    """
+
+    def __init__(self, tick=WHEEL_TICK, slots=WHEEL_SLOTS, clock=time.monotonic):
+        self.tick = tick
+        self.slots = [[] for _ in range(slots)]
+        self.current = int(clock() / tick)   # last tick processed
+        self.size = 0
+
+    def schedule(self, deadline, item):
+        t = max(math.ceil(deadline / self.tick), self.current + 1)
+        self.slots[t % len(self.slots)].append((t, item))
+        self.size += 1
+
+    def advance(self, now):
+        """Everything due by now"""
+        target = int(now / self.tick)
+        due = []
+        n = len(self.slots)
+        for step in range(1, min(target - self.current, n) + 1):
+            i = (self.current + step) % n
+            slot = self.slots[i]
+            if slot:
+                keep = [(t, item) for t, item in slot if t > target]
+                due.extend(item for t, item in slot if t <= target)
+                self.slots[i] = keep
+        self.current = max(self.current, target)
+        self.size -= len(due)
+        return due
+
+# ---------------------------
+# Sessions
+# ---------------------------
+class Session:
+    """One connected player: the engine, this game's plan, and a writer to push timeouts to"""
+
+    __slots__ = ("writer", "engine", "plan", "game_id", "timer_gen")
+
+    def __init__(self, writer, clock):
+        self.writer = writer
+        self.engine = GameEngine(clock=clock, lives=LIVES_PER_WORD, time_limit=LETTER_TIME_LIMIT)
+        self.plan = None
+        self.game_id = 0
+        self.timer_gen = 0
+
+class GameServer:
+    """The game's rules for thousands of players on one asyncio loop.
+
+    Words, emoji and image paths are loaded once and shared read-only by
+    every session; each session holds just its engine and the plan for its
+    current game.  All letter deadlines live in one TimerWheel, ticked by
+    one task, instead of an after() job per player.  Finished games go to
+    the leaderboard through the usual background ScoreWriter.
+    """
+
+    def __init__(self, words, store, clock=time.monotonic):
+        self.words = words
+        self.decks = DeckSampler(words.pool, path=None)   # per-player decks, kept in memory
+        self.clock = clock
+        self.rng = random.Random()   # shared: a Random per session would cost 2.5 KB each
+        self.wheel = TimerWheel(clock=clock)
+        self.score_writer = ScoreWriter(store)
+        self.sessions = set()
+        self.stats = {"games": 0, "moves": 0, "timeouts": 0}
+        self.games_started = 0
+
+    # ----- replies -----
+    def state(self, session, outcome=IGNORED, **extra):
+        engine = session.engine
+        reply = {"outcome": OUTCOME_NAMES[outcome], "score": engine.score, "lives": engine.lives,
+                 "over": engine.over}
+        rnd = session.plan.round(engine.word_index, engine.letter_index) if session.plan else None
+        if rnd is not None and not engine.over:
+            reply.update(word=rnd.display, emoji=rnd.emoji, options=rnd.options,
+                         image=self.words.images.get(engine.word().lower()), hints=engine.hints_left,
+                         word_no=engine.word_index + 1, words=len(engine.words),
+                         seconds=round(engine.remaining(), 1) if engine.deadline is not None else None)
+        reply.update(extra)
+        return reply
+
+    def _after_move(self, session, outcome):
+        """Advance past a finished word, book the score at game over, re-arm the timer"""
+        engine = session.engine
+        if outcome == WORD_DONE:
+            engine.next_word()
+        if engine.over:
+            self._book(session)
+        elif engine.deadline is not None:
+            session.timer_gen += 1
+            self.wheel.schedule(engine.deadline, (session, session.timer_gen))
+
+    def _book(self, session):
+        """Send a game that ended (game over or out of words) to the leaderboard"""
+        if session.game_id:
+            engine = session.engine
+            self.score_writer.submit(session.game_id, (engine.player, engine.score, engine.mode, now_ts()))
+        self._abandon(session)
+
+    def _abandon(self, session):
+        """Forget the current game without scoring it (restart, disconnect); its timer goes stale"""
+        session.game_id = 0
+        session.timer_gen += 1
+
+    # ----- moves (the same rules as GuessTheLetterGame's handlers) -----
+    def start(self, session, name, mode):
+        if not isinstance(name, str) or not name.isalpha():
+            return {"error": "Nickname must contain letters only!"}
+        if not isinstance(mode, str) or mode not in self.words.pool.modes:
+            return {"error": f"unknown mode {mode!r}"}
+        self._abandon(session)   # a game left unfinished isn't scored
+        words = self.decks.draw(name, mode, WORDS_PER_GAME)
+        session.plan = build_plan(mode, words, self.words.emoji, self.words.fallback, self.rng.getrandbits(64))
+        session.engine.start(mode, words, name)
+        self.games_started += 1
+        session.game_id = self.games_started
+        self.stats["games"] += 1
+        self._after_move(session, IGNORED)
+        return self.state(session)
+
+    def guess(self, session, letter):
+        if not isinstance(letter, str) or not letter:
+            return self.state(session)
+        outcome = session.engine.guess(letter)
+        self._after_move(session, outcome)
+        return self.state(session, outcome)
+
+    def type_text(self, session, text):
+        # guess_word checks the text: a single letter goes on to guess(), anything but letters is ignored
+        outcome = session.engine.guess_word(text if isinstance(text, str) else "")
+        self._after_move(session, outcome)
+        return self.state(session, outcome, penalty=session.engine.last_penalty if outcome == WRONG else 0)
+
+    def hint(self, session):
+        return self.state(session, hint=session.engine.hint())
+
+    def skip(self, session):
+        outcome = session.engine.skip()
+        self._after_move(session, outcome)
+        return self.state(session, outcome)
+
+    def _timeout(self, session):
+        outcome = session.engine.tick()
+        if outcome == IGNORED:
+            # deadline moved (the clock was paused or the wheel woke a hair early)
+            if session.engine.deadline is not None:
+                self.wheel.schedule(session.engine.deadline, (session, session.timer_gen))
+            return
+        self.stats["timeouts"] += 1
+        self._after_move(session, outcome)
+        self._push(session, dict(self.state(session, outcome), event="timeout"))
+
+    def _push(self, session, msg):
+        writer = session.writer
+        if writer.is_closing():
+            return
+        writer.write(json.dumps(msg).encode("utf-8") + b"\n")
+
+    # ----- plumbing -----
+    def dispatch(self, session, req):
+        op = req.get("op")
+        self.stats["moves"] += 1
+        if op == "guess":
+            return self.guess(session, req.get("letter"))
+        if op == "type":
+            return self.type_text(session, req.get("text"))
+        if op == "hint":
+            return self.hint(session)
+        if op == "skip":
+            return self.skip(session)
+        if op == "start":
+            return self.start(session, req.get("name"), req.get("mode", "Medium"))
+        if op == "stats":
+            return dict(self.stats, sessions=len(self.sessions), timers=self.wheel.size)
+        return {"error": f"unknown op {op!r}"}
+
+    async def _handle(self, reader, writer):
+        session = Session(writer, self.clock)
+        self.sessions.add(session)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    req = json.loads(line)
+                except ValueError:
+                    req = None
+                try:
+                    reply = self.dispatch(session, req) if isinstance(req, dict) else {"error": "bad request"}
+                except Exception as e:   # a request nothing above foresaw costs its reply, not the connection
+                    reply = {"error": f"bad request ({e})"}
+                writer.write(json.dumps(reply).encode("utf-8") + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._abandon(session)
+            self.sessions.discard(session)
+            writer.close()
+
+    async def _run_wheel(self):
+        while True:
+            await asyncio.sleep(self.wheel.tick)
+            for session, gen in self.wheel.advance(self.clock()):
+                if gen == session.timer_gen and session in self.sessions:
+                    self._timeout(session)
+
+    async def serve(self, host, port):
+        wheel = asyncio.create_task(self._run_wheel())
+        server = await asyncio.start_server(self._handle, host, port, backlog=4096)
+        print(f"Game server on {host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            wheel.cancel()
+            self.score_writer.close()
+
+# ---------------------------
+# Load generator
+# ---------------------------
+async def _player(host, port, no, games, think, latencies, counts):
+    reader, writer = await asyncio.open_connection(host, port)
+    rng = random.Random(no)
+
+    async def call(req):
+        start = time.perf_counter()
+        writer.write(json.dumps(req).encode("utf-8") + b"\n")
+        while True:
+            reply = json.loads(await reader.readline())
+            if "event" not in reply:
+                latencies.append(time.perf_counter() - start)
+                return reply
+            counts["timeouts"] += 1
+
+    for _ in range(games):
+        state = await call({"op": "start", "name": f"bot{chr(97 + no % 26)}", "mode": rng.choice(("Easy", "Medium", "Hard"))})
+        while not state.get("over"):
+            await asyncio.sleep(rng.expovariate(1 / think))
+            roll = rng.random()
+            if roll < 0.05:
+                state = await call({"op": "hint"})
+            elif roll < 0.08:
+                state = await call({"op": "skip"})
+            elif roll < 0.1:
+                state = await call({"op": "type", "text": "guess"})
+            else:
+                state = await call({"op": "guess", "letter": rng.choice(state.get("options") or "A")})
+        counts["games"] += 1
+    writer.close()
+
+async def load(host, port, clients, games, think, ramp):
+    latencies = []
+    counts = {"games": 0, "timeouts": 0}
+    start = time.perf_counter()
+    players = []
+    for no in range(clients):
+        players.append(asyncio.create_task(_player(host, port, no, games, think, latencies, counts)))
+        if ramp:
+            await asyncio.sleep(ramp / clients)
+    await asyncio.gather(*players)
+    took = time.perf_counter() - start
+    ms = sorted(t * 1000 for t in latencies)
+    print(f"{clients} players, {counts['games']} games, {len(latencies):,} moves in {took:.1f}s "
+          f"({len(latencies) / took:,.0f} moves/s), {counts['timeouts']} timeouts pushed")
+    print(f"move latency p50 {percentile(ms, 0.5):.2f} ms, p99 {percentile(ms, 0.99):.2f} ms, max {ms[-1]:.2f} ms")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Multi-player game server")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("serve")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=DEFAULT_PORT)
+    p.add_argument("--words", default=os.environ.get("GUESS_WORDS", PACK_FILE), help="word pack (else dictionary.py)")
+    p.add_argument("--store", default=SCORES_FILE, help="leaderboard file (*.db for SQLite)")
+    p = sub.add_parser("load")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=DEFAULT_PORT)
+    p.add_argument("--clients", type=int, default=500)
+    p.add_argument("--games", type=int, default=2, help="games per client")
+    p.add_argument("--think", type=float, default=0.5, help="mean seconds between a client's moves")
+    p.add_argument("--ramp", type=float, default=2.0, help="seconds over which clients connect")
+    args = parser.parse_args(argv)
+    try:
+        if args.command == "serve":
+            server = GameServer(load_words(args.words), open_leaderboard(args.store))
+            asyncio.run(server.serve(args.host, args.port))
+        else:
+            asyncio.run(load(args.host, args.port, args.clients, args.games, args.think, args.ramp))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
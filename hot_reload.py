@@ -0,0 +1,183 @@
+# hot_reload.py
+# Picks up edits to the word lists and pictures while the game is running:
+# dictionary.py (or words.pack when there is one), assets.bundle and the
+# loose image files behind whatever is in the image cache.
+import os
+import runpy
+import threading
+from collections import namedtuple
+from asset_bundle import AssetSource, BASE_DIR, BUNDLE_FILE
+from wordpack import WordPack, WordContent, PACK_FILE
+from word_sampler import WordPool
+
+RELOAD_INTERVAL = 2.0   # seconds between checks of the sources
+IMAGE_SWEEP_POLLS = 15  # polls between stats of every cached image (catches files overwritten in place)
+DICTIONARY_FILE = "dictionary.py"
+MODE_LISTS = {"Easy": "EASY_WORDS", "Medium": "MEDIUM_WORDS", "Hard": "HARD_WORDS"}
+
+# content/assets: what to run the next game on; modes: word lists that changed;
+# images: words whose decoded image is out of date
+Update = namedtuple("Update", "content assets modes images")
+
+def _stat(path):
+    try:
+        st = os.stat(path)
+        return (st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None
+
+def _mode_meta(pool, mode):
+    """A word pack's header entry for a mode, minus its offset (which moves when other modes change)"""
+    meta = pool.header["modes"].get(mode) if isinstance(pool, WordPack) else None
+    return None if meta is None else {k: v for k, v in meta.items() if k != "offset"}
+
+class ContentReloader:
+    """Watches the word and asset sources and prepares replacements in the background.
+
+    A poll thread stats the sources every interval.  When one changed it
+    builds the replacement next to the live content, reusing what the
+    change didn't touch: an edited dictionary.py rebuilds only the modes
+    whose list differs (WordPool.updated), a new words.pack is only mapped,
+    and cached images are dropped only for words whose path or file
+    changed.  The result is parked until the game calls take() between
+    games, so a game in progress never sees a half-applied change.
+    """
+
+    def __init__(self, content, assets, prefetcher, pack_path=PACK_FILE, base_dir=BASE_DIR,
+                 interval=RELOAD_INTERVAL):
+        self.content = content
+        self.assets = assets
+        self.prefetcher = prefetcher
+        self.interval = interval
+        self.base_dir = base_dir
+        self.pack_path = pack_path if os.path.isabs(pack_path) else os.path.join(base_dir, pack_path)
+        self.dictionary_path = os.path.join(base_dir, DICTIONARY_FILE)
+        self.bundle_path = os.path.join(base_dir, BUNDLE_FILE)
+        self.stats = {p: _stat(p) for p in (self.pack_path, self.dictionary_path, self.bundle_path)}
+        # the lists the live pool was built from, to tell which modes an edit touched
+        self.lists = None
+        if isinstance(content.pool, WordPool):
+            import dictionary
+            self.lists = {m: getattr(dictionary, name) for m, name in MODE_LISTS.items()}
+        self.image_versions = {}   # word -> asset version when its image was cached
+        self.image_dirs = {}       # directory of cached images -> its stat at the last poll
+        self.polls = 0
+        self.pending = None
+        self.reloads = 0
+        self.lock = threading.Lock()
+        self._stop = threading.Event()
+        self.thread = None
+
+    # ----- background side -----
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name="hot-reload", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"Reload failed: {e}")
+
+    def poll(self):
+        """Check every source once; returns the pending Update if this found a change"""
+        changed = set()
+        for path, old in self.stats.items():
+            new = _stat(path)
+            if new != old:
+                self.stats[path] = new
+                changed.add(path)
+        with self.lock:
+            base = self.pending
+        content = base.content if base else self.content
+        assets = base.assets if base else self.assets
+        new_content, modes = content, set()
+        uses_pack = isinstance(content.pool, WordPack)
+        if self.pack_path in changed or (self.dictionary_path in changed and not uses_pack):
+            new_content, modes = self._reload_words(content)
+        new_assets = AssetSource(self.bundle_path, self.base_dir) if self.bundle_path in changed else assets
+        stale = self._stale_images(content, new_content, new_assets,
+                                   sweep=new_content is not content or new_assets is not assets)
+        if new_content is content and new_assets is assets and not stale:
+            return None
+        with self.lock:
+            # only take() touches pending meanwhile, and then base is already live
+            if base is not None and self.pending is base:
+                modes |= base.modes
+                stale |= base.images
+            self.pending = Update(new_content, new_assets, modes, stale)
+            self.reloads += 1
+            return self.pending
+
+    def _reload_words(self, content):
+        if os.path.exists(self.pack_path):
+            try:
+                pack = WordPack(self.pack_path)   # only the header is read; sections are mapped lazily
+            except (OSError, ValueError) as e:
+                print(f"Ignoring word pack {self.pack_path}: {e}")
+            else:
+                self.lists = None
+                modes = {m for m in pack.modes if _mode_meta(pack, m) != _mode_meta(content.pool, m)}
+                return WordContent(pack, pack.images, pack.emoji, pack.fallback), modes
+        try:
+            ns = runpy.run_path(self.dictionary_path)
+            lists = {m: ns[name] for m, name in MODE_LISTS.items()}
+            new = (ns["WORD_IMAGES"], ns["LETTER_EMOJI_MAP"], ns["FALLBACK_EMOJI"])
+        except Exception as e:   # caught mid-edit: keep the current lists until the next save
+            print(f"Ignoring {self.dictionary_path}: {e}")
+            return content, set()
+        if isinstance(content.pool, WordPool) and self.lists is not None:
+            modes = {m for m, words in lists.items() if words != self.lists.get(m)}
+            pool = content.pool.updated({m: lists[m] for m in modes}) if modes else content.pool
+        else:
+            modes = set(lists)
+            pool = WordPool(lists)
+        self.lists = lists
+        return WordContent(pool, *new), modes
+
+    def _stale_images(self, content, new_content, assets, sweep=False):
+        """Cached words whose image path or file changed; only the cache is looked at, never the dictionary.
+
+        The image files are only stat-ed when something may have changed:
+        the word lists or assets did (sweep), a directory holding cached
+        images did (saving, adding or removing a file touches it), or every
+        IMAGE_SWEEP_POLLS polls for a file overwritten in place.  Otherwise
+        only words cached since the last poll are looked at.
+        """
+        self.polls += 1
+        words = self.prefetcher.cached_words()
+        paths = {word: new_content.images.get(word) for word in words}
+        dirs = {os.path.dirname(os.path.join(self.base_dir, p)) for p in paths.values() if p}
+        dir_stats = {d: _stat(d) for d in dirs}
+        sweep = sweep or dir_stats != self.image_dirs or self.polls % IMAGE_SWEEP_POLLS == 0
+        self.image_dirs = dir_stats
+        stale = set()
+        versions = {}
+        for word, path in paths.items():
+            if path is None or path != content.images.get(word):
+                stale.add(word)
+                continue
+            if not sweep and word in self.image_versions:
+                versions[word] = self.image_versions[word]
+                continue
+            try:
+                versions[word] = assets.version(path)
+            except OSError:
+                versions[word] = None
+            if word in self.image_versions and versions[word] != self.image_versions[word]:
+                stale.add(word)
+        self.image_versions = versions
+        return stale
+
+    # ----- game side -----
+    def take(self):
+        """The pending Update, if any (Tk thread, between games); it becomes the live content"""
+        with self.lock:
+            update, self.pending = self.pending, None
+        if update is not None:
+            self.content, self.assets = update.content, update.assets
+        return update
@@ -0,0 +1,149 @@
+# instrument.py
+import os
+import sys
+import json
+import time
+import pstats
+import cProfile
+import functools
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+TRACE_FILE = "trace.json"
+PROFILE_FILE = "profile.pstats"
+MAX_EVENTS = 500000   # spans kept for the trace; later ones are only counted
+
+def percentile(values, p):
+    """The value at fraction p (0..1) of a sorted, non-empty list (nearest rank)"""
+    return values[min(len(values) - 1, int(p * len(values)))]
+
+# ---------------------------
+# Spans and counters
+# ---------------------------
+class Tracer:
+    """Timing spans and counters, exported as a Chrome trace (chrome://tracing, Perfetto).
+
+    Nothing is instrumented until install() wraps specific functions, so
+    a game started without tracing runs its original, unwrapped code.
+    """
+
+    def __init__(self, max_events=MAX_EVENTS):
+        self.t0 = time.perf_counter()
+        self.max_events = max_events
+        self.events = []   # (name, start, end, thread id)
+        self.counters = Counter()
+        self.threads = {}
+
+    def record(self, name, start, end):
+        tid = threading.get_ident()
+        if tid not in self.threads:
+            self.threads[tid] = threading.current_thread().name
+        if len(self.events) < self.max_events:
+            self.events.append((name, start, end, tid))
+        else:
+            self.counters["trace.dropped"] += 1
+
+    def count(self, name, n=1):
+        self.counters[name] += n
+
+    @contextmanager
+    def span(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter())
+
+    def wrap(self, fn, name):
+        @functools.wraps(fn)
+        def traced(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.record(name, start, time.perf_counter())
+        return traced
+
+    def install(self, owner, names, prefix=""):
+        """Replace owner.name (a module, class or instance attribute) with a traced version"""
+        for name in names:
+            setattr(owner, name, self.wrap(getattr(owner, name), prefix + name))
+
+    def count_calls(self, owner, name, counter):
+        fn = getattr(owner, name)
+
+        @functools.wraps(fn)
+        def counted(*args, **kwargs):
+            self.counters[counter] += 1
+            return fn(*args, **kwargs)
+        setattr(owner, name, counted)
+
+    def until_idle(self, widget, name):
+        """Span from now until Tk next goes idle, i.e. until the resulting frame is drawn"""
+        start = time.perf_counter()
+        widget.after_idle(lambda: self.record(name, start, time.perf_counter()))
+
+    # ----- export -----
+    def summary(self):
+        """count / total / mean / p50 / p99 / max in ms per span name"""
+        by_name = {}
+        for name, start, end, _ in self.events:
+            by_name.setdefault(name, []).append((end - start) * 1000)
+        out = {}
+        for name, times in sorted(by_name.items()):
+            times.sort()
+            out[name] = {"count": len(times), "total_ms": round(sum(times), 3),
+                         "mean_ms": round(sum(times) / len(times), 3),
+                         "p50_ms": round(percentile(times, 0.5), 3), "p99_ms": round(percentile(times, 0.99), 3),
+                         "max_ms": round(times[-1], 3)}
+        return out
+
+    def chrome_trace(self):
+        pid = os.getpid()
+        us = lambda t: round((t - self.t0) * 1e6, 1)
+        events = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": tname}}
+                  for tid, tname in self.threads.items()]
+        events += [{"name": name, "ph": "X", "pid": pid, "tid": tid, "ts": us(start), "dur": us(end) - us(start)}
+                   for name, start, end, tid in self.events]
+        end = max((e[2] for e in self.events), default=self.t0)
+        events += [{"name": name, "ph": "C", "pid": pid, "ts": us(end), "args": {"value": value}}
+                   for name, value in sorted(self.counters.items())]
+        return {"traceEvents": events, "displayTimeUnit": "ms",
+                "otherData": {"summary": self.summary(), "counters": dict(self.counters)}}
+
+    def save(self, path=TRACE_FILE):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f)
+
+    def report(self):
+        lines = [f"{'span':<28} {'count':>7} {'mean ms':>9} {'p50':>8} {'p99':>8} {'max':>8}"]
+        for name, s in self.summary().items():
+            lines.append(f"{name:<28} {s['count']:>7} {s['mean_ms']:>9.3f} {s['p50_ms']:>8.3f} "
+                         f"{s['p99_ms']:>8.3f} {s['max_ms']:>8.3f}")
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"{name:<28} {value:>7}")
+        return "\n".join(lines)
+
+# ---------------------------
+# cProfile capture
+# ---------------------------
+class Profiler:
+    """cProfile around a block; stats go to a .pstats file and the top entries are printed"""
+
+    def __init__(self, path=PROFILE_FILE, top=25):
+        self.path = path
+        self.top = top
+        self.profile = cProfile.Profile()
+
+    @contextmanager
+    def running(self):
+        self.profile.enable()
+        try:
+            yield
+        finally:
+            self.profile.disable()
+            self.profile.dump_stats(self.path)
+            stats = pstats.Stats(self.profile, stream=sys.stdout)
+            stats.sort_stats("cumulative").print_stats(self.top)
+            print(f"Profile written to {self.path}")
@@ -0,0 +1,543 @@
+# leaderboard_store.py
+import os
+import json
+import math
+import heapq
+import queue
+import sqlite3
+import threading
+import time
+from bisect import insort
+from collections import OrderedDict
+from datetime import datetime
+
+MODES = ("Easy", "Medium", "Hard")
+TOP_K = 50               # entries kept per mode in the index
+COMPACT_EVERY = 500      # appends between compaction checks
+INDEX_SUFFIX = ".idx"
+ARCHIVE_SUFFIX = ".archive"   # rows compaction dropped from the log, for analytics
+
+# ---------------------------
+# Line format helpers
+# ---------------------------
+def parse_line(line):
+    """Parse one 'name | score | mode | ts' line, return a tuple or None if malformed"""
+    parts = line.strip().split(" | ")
+    if len(parts) < 3:
+        return None
+    name, score, mode = parts[:3]
+    if mode not in MODES:
+        return None
+    try:
+        score = int(score)
+    except ValueError:
+        return None
+    ts = parts[3] if len(parts) > 3 else ""
+    return (name, score, mode, ts)
+
+def format_line(name, score, mode, ts):
+    return f"{name} | {score} | {mode} | {ts}\n"
+
+def now_ts():
+    return datetime.now().strftime("%Y-%m-%d %H:%M")
+
+def format_rank(rank, total):
+    """'#8,412 of 230,000 (top 4%)'"""
+    if not total:
+        return "No scores yet"
+    pct = max(1, math.ceil(rank * 100 / total))
+    return f"#{rank:,} of {total:,} (top {pct}%)"
+
+def _entry_key(item):
+    # item is (seq, name, score, ts); best score first, older entry first on ties
+    return (-item[2], item[0])
+
+# ---------------------------
+# Score histogram (order statistics)
+# ---------------------------
+class ScoreHistogram:
+    """Fenwick tree over integer scores.
+
+    Scores are small integers, so counting how many entries beat a score is
+    O(log max_score) no matter how many millions of entries were recorded.
+    """
+
+    def __init__(self, counts=None):
+        self.size = 64
+        self.tree = [0] * (self.size + 1)
+        self.counts = {}
+        self.total = 0
+        for score, count in (counts or {}).items():
+            self.add(int(score), count)
+
+    def _bump(self, score, count):
+        i = score + 1
+        while i <= self.size:
+            self.tree[i] += count
+            i += i & -i
+
+    def add(self, score, count=1):
+        score = max(0, score)
+        if score >= self.size:
+            while self.size <= score:
+                self.size *= 2
+            self.tree = [0] * (self.size + 1)
+            for s, c in self.counts.items():
+                self._bump(s, c)
+        self.counts[score] = self.counts.get(score, 0) + count
+        self.total += count
+        self._bump(score, count)
+
+    def count_at_most(self, score):
+        if score < 0:
+            return 0
+        i = min(score + 1, self.size)
+        n = 0
+        while i > 0:
+            n += self.tree[i]
+            i -= i & -i
+        return n
+
+    def rank(self, score):
+        """1-based rank a score would get: one plus the number of strictly better entries"""
+        return 1 + self.total - self.count_at_most(score)
+
+# ---------------------------
+# Text log + persistent top-K index
+# ---------------------------
+class TextLeaderboard:
+    """Append-only leaderboard.txt with a small per-mode top-K index next to it.
+
+    The index remembers how many bytes of the log it has seen, so anything
+    appended by another writer is picked up by reading only the new tail.
+    """
+
+    def __init__(self, path, top_k=TOP_K, max_entries=1000, compact_every=COMPACT_EVERY):
+        self.path = path
+        self.index_path = path + INDEX_SUFFIX
+        self.top_k = top_k
+        self.max_entries = max_entries
+        self.compact_every = compact_every
+        self._reset()
+
+    def _reset(self):
+        self.offset = 0
+        self.seq = 0
+        self.appends = 0
+        self.counts = {m: 0 for m in MODES}
+        self.tops = {m: [] for m in MODES}
+        self.hists = {m: ScoreHistogram() for m in MODES}
+        self._index_stat = None
+
+    # ----- index persistence -----
+    def _stat_index(self):
+        try:
+            st = os.stat(self.index_path)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.offset = data["offset"]
+            self.seq = data["seq"]
+            self.appends = data["appends"]
+            self.counts = {m: data["counts"].get(m, 0) for m in MODES}
+            self.tops = {m: [tuple(e) for e in data["tops"].get(m, [])] for m in MODES}
+            self.hists = {m: ScoreHistogram(data["hists"].get(m)) for m in MODES}
+            self._index_stat = self._stat_index()
+            return True
+        except (OSError, ValueError, KeyError, TypeError):
+            self._reset()
+            return False
+
+    def _save_index(self):
+        data = {
+            "offset": self.offset,
+            "seq": self.seq,
+            "appends": self.appends,
+            "counts": self.counts,
+            "tops": self.tops,
+            "hists": {m: h.counts for m, h in self.hists.items()},
+        }
+        tmp = self.index_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp, self.index_path)
+        self._index_stat = self._stat_index()
+
+    def _ingest(self, entry):
+        name, score, mode, ts = entry
+        self.seq += 1
+        self.counts[mode] += 1
+        self.hists[mode].add(score)
+        top = self.tops[mode]
+        item = (self.seq, name, score, ts)
+        if len(top) < self.top_k or _entry_key(item) < _entry_key(top[-1]):
+            insort(top, item, key=_entry_key)
+            del top[self.top_k:]
+
+    def _ingest_tail(self):
+        """Read whatever was appended to the log since the index was written"""
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break  # half-written line, pick it up next time
+                self.offset += len(raw)
+                entry = parse_line(raw.decode("utf-8", errors="replace"))
+                if entry:
+                    self._ingest(entry)
+
+    def refresh(self):
+        """Bring the in-memory index up to date with the log; cost depends only on new data"""
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            self._reset()
+            return
+        fresh = self._index_stat is not None and self._stat_index() == self._index_stat
+        if not (fresh or self._load_index()) or size < self.offset:
+            # index missing or log rewritten behind our back -> rebuild
+            self._reset()
+        if size > self.offset:
+            self._ingest_tail()
+            self._save_index()
+
+    # ----- public API -----
+    def add(self, name, score, mode, ts=None):
+        self.add_many([(name, score, mode, ts or now_ts())])
+
+    def add_many(self, entries, game_ids=None):
+        # game ids aren't kept in the text format; ScoreWriter drops repeats before they get here
+        self.refresh()
+        data = "".join(format_line(*e) for e in entries)
+        if os.path.exists(self.path) and os.path.getsize(self.path) > self.offset:
+            data = "\n" + data  # never glue onto an unterminated last line
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(data)
+        self._ingest_tail()
+        self.appends += len(entries)
+        if self.appends >= self.compact_every:
+            self.compact()
+        self._save_index()
+        return len(entries)
+
+    def add_each(self, entries, game_ids=None):
+        """add_many(), returning for each entry whether it was stored (always, here)"""
+        entries = list(entries)
+        self.add_many(entries, game_ids)
+        return [True] * len(entries)
+
+    def top(self, mode, n=5):
+        self.refresh()
+        return [(name, score, mode, ts) for _, name, score, ts in self.tops[mode][:n]]
+
+    def rank(self, mode, score):
+        """(rank, total) of a score among every score ever recorded for the mode"""
+        self.refresh()
+        hist = self.hists[mode]
+        return hist.rank(score), hist.total
+
+    def load(self):
+        """Top-K entries per mode, in the shape load_leaderboard() always returned"""
+        self.refresh()
+        return {m: [(e[1], e[2], m, e[3]) for e in self.tops[m]] for m in MODES}
+
+    def sync(self):
+        """fsync the log so appended scores survive a power cut"""
+        if os.path.exists(self.path):
+            with open(self.path, "a", encoding="utf-8") as f:
+                os.fsync(f.fileno())
+
+    def close(self):
+        pass
+
+    def compact(self):
+        """Rewrite the log keeping only the best max_entries rows of each mode.
+
+        The rows dropped are appended, in log order, to the archive next to
+        the log, so log + archive still hold every game ever recorded.
+        """
+        self.appends = 0
+        if all(c <= self.max_entries for c in self.counts.values()):
+            return
+        keep = {m: [] for m in MODES}
+        seq = 0
+        with open(self.path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                entry = parse_line(line)
+                if not entry:
+                    continue
+                seq += 1
+                heap = keep[entry[2]]
+                item = (entry[1], -seq, entry)
+                if len(heap) < self.max_entries:
+                    heapq.heappush(heap, item)
+                elif item > heap[0]:
+                    heapq.heapreplace(heap, item)
+        rows = sorted((-s, e) for heap in keep.values() for _, s, e in heap)
+        kept = {seq for seq, _ in rows}
+        seq = 0
+        with open(self.path, "r", encoding="utf-8", errors="replace") as f, \
+                open(self.path + ARCHIVE_SUFFIX, "a", encoding="utf-8") as archive:
+            for line in f:
+                entry = parse_line(line)
+                if entry:
+                    seq += 1
+                    if seq not in kept:
+                        archive.write(format_line(*entry))
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for _, e in rows:
+                f.write(format_line(*e))
+        os.replace(tmp, self.path)
+        hists = self.hists  # rank/percentile keep covering the full history
+        self._reset()
+        self._ingest_tail()
+        self.hists = hists
+
+# ---------------------------
+# SQLite backend (WAL)
+# ---------------------------
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    mode TEXT NOT NULL,
+    ts TEXT NOT NULL DEFAULT '',
+    game_id TEXT UNIQUE
+);
+CREATE TEMP TABLE IF NOT EXISTS staged (
+    id INTEGER PRIMARY KEY,
+    name TEXT,
+    score INTEGER,
+    mode TEXT,
+    ts TEXT
+);
+CREATE INDEX IF NOT EXISTS scores_mode_score ON scores (mode, score DESC, id);
+CREATE INDEX IF NOT EXISTS scores_name ON scores (name);
+CREATE TABLE IF NOT EXISTS score_counts (
+    mode TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    n INTEGER NOT NULL,
+    PRIMARY KEY (mode, score)
+) WITHOUT ROWID;
+CREATE TRIGGER IF NOT EXISTS scores_counted AFTER INSERT ON scores BEGIN
+    INSERT INTO score_counts (mode, score, n) VALUES (NEW.mode, NEW.score, 1)
+    ON CONFLICT (mode, score) DO UPDATE SET n = n + 1;
+END;
+"""
+
+# game id for a row that came without one (text logs, CSV, other databases): its
+# contents plus which copy of them it is in its batch, so importing the same file
+# twice adds nothing while two alike games in one file are both kept
+_CONTENT_ID = ("name || '|' || score || '|' || mode || '|' || ts || '#' || "
+               "ROW_NUMBER() OVER (PARTITION BY name, score, mode, ts ORDER BY id)")
+
+class SQLiteLeaderboard:
+    """Leaderboard in a SQLite database, safe for several game processes at once.
+
+    WAL mode lets readers and writers run concurrently, top-N reads walk the
+    (mode, score) index, and ranks come from the per-score counts the insert
+    trigger keeps up to date.  A row submitted with a game id is stored
+    once however often it is resent; rows are never deduplicated on their
+    contents, since two games can end with the same name, score and minute.
+    """
+
+    def __init__(self, path, top_k=TOP_K, legacy_path=None):
+        self.path = path
+        self.top_k = top_k
+        fresh = not os.path.exists(path)
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+        if fresh and legacy_path and os.path.exists(legacy_path):
+            self.import_text(legacy_path)
+
+    def import_text(self, path, batch=5000):
+        """Stream a leaderboard.txt into the database, return (imported, skipped)"""
+        skipped = 0
+        rows = []
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                entry = parse_line(line)
+                if entry is None:
+                    skipped += bool(line.strip())
+                    continue
+                rows.append(entry)
+                if len(rows) >= batch:
+                    self.stage(rows)
+                    rows = []
+        self.stage(rows)
+        return self.add_staged(), skipped
+
+    def stage(self, entries):
+        """Park entries that have no game id until add_staged() (bulk imports)"""
+        with self.conn:
+            self.conn.executemany("INSERT INTO staged (name, score, mode, ts) VALUES (?, ?, ?, ?)", entries)
+
+    def add_staged(self):
+        """Store the staged entries under content ids (_CONTENT_ID), return how many were new"""
+        with self.conn:
+            added = self.conn.execute(
+                "INSERT OR IGNORE INTO scores (name, score, mode, ts, game_id) "
+                f"SELECT name, score, mode, ts, {_CONTENT_ID} FROM staged ORDER BY id").rowcount
+            self.conn.execute("DELETE FROM staged")
+        return added
+
+    def _insert(self, rows):
+        """Insert rows in one transaction, return for each whether it was new"""
+        if not rows:
+            return []
+        with self.conn:
+            cur = self.conn.cursor()
+            # rowcount leaves out the score_counts rows the trigger touches
+            return [cur.execute("INSERT OR IGNORE INTO scores (name, score, mode, ts, game_id) "
+                                "VALUES (?, ?, ?, ?, ?)", row).rowcount == 1 for row in rows]
+
+    # ----- public API -----
+    def add(self, name, score, mode, ts=None):
+        self.add_many([(name, score, mode, ts or now_ts())])
+
+    def add_many(self, entries, game_ids=None):
+        """Insert entries, return how many were new (an entry whose game id is stored already isn't)"""
+        return sum(self.add_each(entries, game_ids))
+
+    def add_each(self, entries, game_ids=None):
+        """add_many(), returning for each entry whether it was new"""
+        entries = list(entries)
+        game_ids = game_ids if game_ids is not None else [None] * len(entries)
+        return self._insert([tuple(e) + (g,) for e, g in zip(entries, game_ids)])
+
+    def top(self, mode, n=5):
+        return self.conn.execute(
+            "SELECT name, score, mode, ts FROM scores WHERE mode = ? "
+            "ORDER BY score DESC, id LIMIT ?", (mode, n)).fetchall()
+
+    def rank(self, mode, score):
+        better, total = self.conn.execute(
+            "SELECT COALESCE(SUM(CASE WHEN score > ? THEN n END), 0), COALESCE(SUM(n), 0) "
+            "FROM score_counts WHERE mode = ?", (score, mode)).fetchone()
+        return better + 1, total
+
+    def load(self):
+        return {m: self.top(m, self.top_k) for m in MODES}
+
+    def sync(self):
+        # commits are not fsynced under synchronous=NORMAL; a checkpoint is
+        self.conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    def close(self):
+        self.conn.close()
+
+def open_leaderboard(path, max_entries=1000, legacy_path=None):
+    """Pick the backend from the file name: *.db/*.sqlite -> SQLite, anything else -> text log"""
+    if path.lower().endswith(SQLITE_SUFFIXES):
+        return SQLiteLeaderboard(path, legacy_path=legacy_path)
+    return TextLeaderboard(path, max_entries=max_entries)
+
+# ---------------------------
+# Write-behind queue
+# ---------------------------
+_STOP = object()
+
+class ScoreWriter:
+    """Persist scores on a background thread so the Tk thread never waits on disk.
+
+    Each submission carries a key, one per game, so a game-over that fires
+    twice writes one row.  The key is also stored as the row's game id, and
+    a store that keeps game ids drops a resent row.  Writes are batched, the
+    store is synced every fsync_interval seconds, and queries run on the
+    same thread after any pending writes, so they see the player's own score.
+    """
+
+    def __init__(self, store, maxsize=256, batch_size=64, fsync_interval=5.0, remember=1024):
+        self.store = store
+        self.batch_size = batch_size
+        self.fsync_interval = fsync_interval
+        self.remember = remember
+        self.queue = queue.Queue(maxsize)
+        self._keys = OrderedDict()
+        self._keys_lock = threading.Lock()
+        self._dirty = False
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="score-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, key, entry):
+        """Queue (name, score, mode, ts); return False if this key was already submitted"""
+        with self._keys_lock:
+            if self._closed or key in self._keys:
+                return False
+            self._keys[key] = True
+            while len(self._keys) > self.remember:
+                self._keys.popitem(last=False)
+        self.queue.put(("add", (key, entry), None))
+        return True
+
+    def query(self, fn, callback):
+        """Run fn(store) on the writer thread and hand the result to callback (on that thread)"""
+        self.queue.put(("query", fn, callback))
+
+    def flush(self, timeout=None):
+        """Block until everything queued so far is written and synced"""
+        done = threading.Event()
+        self.queue.put(("flush", None, done.set))
+        return done.wait(timeout)
+
+    def close(self, timeout=5.0):
+        with self._keys_lock:
+            if self._closed:
+                return
+            self._closed = True
+        self.queue.put(("stop", None, None))
+        self._thread.join(timeout)
+
+    def _run(self):
+        last_sync = time.monotonic()
+        while True:
+            try:
+                # wake up on our own to sync if something is still unsynced
+                batch = [self.queue.get(timeout=self.fsync_interval if self._dirty else None)]
+            except queue.Empty:
+                batch = []
+            while batch and len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            added = [arg for op, arg, _ in batch if op == "add"]
+            if added:
+                try:
+                    self.store.add_many([entry for _, entry in added], [key for key, _ in added])
+                    self._dirty = True
+                except Exception as e:
+                    print(f"Failed to save scores: {e}")
+            ops = {op for op, _, _ in batch}
+            now = time.monotonic()
+            if self._dirty and (ops & {"flush", "stop"} or now - last_sync >= self.fsync_interval):
+                try:
+                    self.store.sync()
+                except Exception as e:
+                    print(f"Failed to sync scores: {e}")
+                self._dirty = False
+                last_sync = now
+            for op, arg, callback in batch:
+                if op == "query":
+                    try:
+                        result = arg(self.store)
+                    except Exception as e:
+                        print(f"Leaderboard query failed: {e}")
+                        result = None
+                    callback(result)
+                elif op == "flush":
+                    callback()
+            if "stop" in ops:
+                return
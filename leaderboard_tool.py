@@ -1,29 +1,338 @@
 # leaderboard_tool.py
+# Operations CLI for leaderboards.  Every command streams its input, so
+# memory stays flat on multi-GB logs; commands over several files spread
+# them across a process pool.
+#   python leaderboard_tool.py top kiosk*.txt -n 10
+#   python leaderboard_tool.py validate kiosk*.txt
+#   python leaderboard_tool.py convert leaderboard.txt scores.csv
+#   python leaderboard_tool.py merge all.db kiosk*.txt old.jsonl
+#   python leaderboard_tool.py rank Medium 12
 import os
-from datetime import datetime
+import sys
+import csv
+import json
+import heapq
+import sqlite3
+import argparse
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from leaderboard_store import (open_leaderboard, format_rank, format_line, parse_line,
+                               SQLiteLeaderboard, MODES, SQLITE_SUFFIXES)
 
 LEADERBOARD_FILE = "leaderboard.txt"
+LEADERBOARD_PATH = os.environ.get("GUESS_LEADERBOARD", LEADERBOARD_FILE)
+MAX_LEADERBOARD = 1000
+BATCH = 20000                  # rows per SQLite transaction
+BULK_CACHE_KB = 64 * 1024      # page cache for bulk loads (index inserts thrash the default 2 MB)
+FIELDS = ("name", "score", "mode", "ts")
+
+_store = None
+
+def store():
+    """The game's own leaderboard, opened on first use"""
+    global _store
+    if _store is None:
+        _store = open_leaderboard(LEADERBOARD_PATH, MAX_LEADERBOARD, legacy_path=LEADERBOARD_FILE)
+    return _store
 
 def load_leaderboard():
-    """Load leaderboard from file, return dict by mode"""
-    if not os.path.exists(LEADERBOARD_FILE):
-        return {"Easy": [], "Medium": [], "Hard": []}
-
-    leaderboards = {"Easy": [], "Medium": [], "Hard": []}
-    with open(LEADERBOARD_FILE, "r", encoding="utf-8") as f:
-        for line in f:
-            parts = line.strip().split(" | ")
-            if len(parts) >= 3:
-                name, score, mode = parts[:3]
-                ts = parts[3] if len(parts) > 3 else ""
-                leaderboards[mode].append((name, int(score), mode, ts))
-    # Sort by score descending
-    for mode in leaderboards:
-        leaderboards[mode].sort(key=lambda x: x[1], reverse=True)
-    return leaderboards
+    """Load leaderboard from the index, return dict by mode (best first)"""
+    return store().load()
 
 def save_to_leaderboard(name, score, mode):
     """Append a new score to the leaderboard file"""
-    ts = datetime.now().strftime("%Y-%m-%d %H:%M")
-    with open(LEADERBOARD_FILE, "a", encoding="utf-8") as f:
-        f.write(f"{name} | {score} | {mode} | {ts}\n")
+    store().add(name, score, mode)
+
+def player_rank(score, mode):
+    """Return (rank, total) of a score over the full history of a mode"""
+    return store().rank(mode, score)
+
+# ---------------------------
+# Formats
+# ---------------------------
+def file_format(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext in SQLITE_SUFFIXES:
+        return "sqlite"
+    if ext in (".csv", ".jsonl"):
+        return ext[1:]
+    return "text"
+
+def _checked(name, score, mode, ts):
+    """A clean (name, score, mode, ts) tuple, or None if a field is unusable"""
+    if not isinstance(name, str) or not name or mode not in MODES:
+        return None
+    try:
+        score = int(score)
+    except (TypeError, ValueError):
+        return None
+    return (name, score, mode, "" if ts is None else str(ts))
+
+def _read_text(f):
+    for line in f:
+        yield parse_line(line) if line.strip() else False
+
+def _read_csv(f):
+    for row in csv.reader(f):
+        if not row:
+            yield False
+        elif row[:2] == ["name", "score"]:
+            yield False   # header
+        else:
+            yield _checked(*row[:4]) if len(row) >= 3 else None
+
+def _read_jsonl(f):
+    for line in f:
+        if not line.strip():
+            yield False
+            continue
+        try:
+            obj = json.loads(line)
+        except ValueError:
+            yield None
+            continue
+        yield _checked(*(obj.get(k) for k in FIELDS)) if isinstance(obj, dict) else None
+
+def read_entries(path, stats=None):
+    """Stream (name, score, mode, ts) from any supported file.
+
+    Malformed records are skipped and counted in stats["skipped"]; blank
+    lines and CSV headers are ignored.
+    """
+    if stats is None:
+        stats = {}
+    stats.setdefault("read", 0)
+    stats.setdefault("skipped", 0)
+    fmt = file_format(path)
+    if fmt == "sqlite":
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            for row in conn.execute("SELECT name, score, mode, ts FROM scores ORDER BY id"):
+                stats["read"] += 1
+                yield row
+        finally:
+            conn.close()
+        return
+    reader = {"text": _read_text, "csv": _read_csv, "jsonl": _read_jsonl}[fmt]
+    with open(path, "r", encoding="utf-8", errors="replace", newline="" if fmt == "csv" else None) as f:
+        for entry in reader(f):
+            if entry is False:
+                continue
+            if entry is None:
+                stats["skipped"] += 1
+                continue
+            stats["read"] += 1
+            yield entry
+
+class EntryWriter:
+    """Streams entries into a text, CSV, JSONL or SQLite file.
+
+    Text formats are written to a temporary file and moved into place on
+    close(), so a failed run never leaves half a file behind.  SQLite
+    output is staged in batches and added on close(); rows get content
+    ids there, so writing the same entries again adds nothing.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.format = file_format(path)
+        self.written = 0
+        self.batch = []
+        if self.format == "sqlite":
+            self.db = SQLiteLeaderboard(path)
+            self.db.conn.execute(f"PRAGMA cache_size=-{BULK_CACHE_KB}")
+            return
+        self.tmp = path + ".tmp"
+        self.f = open(self.tmp, "w", encoding="utf-8", newline="" if self.format == "csv" else None)
+        if self.format == "csv":
+            self.csv = csv.writer(self.f)
+            self.csv.writerow(FIELDS)
+
+    def write(self, entry):
+        if self.format == "sqlite":
+            self.batch.append(entry)
+            if len(self.batch) >= BATCH:
+                self._flush()
+            return
+        if self.format == "text":
+            self.f.write(format_line(*entry))
+        elif self.format == "csv":
+            self.csv.writerow(entry)
+        else:
+            self.f.write(json.dumps(dict(zip(FIELDS, entry)), ensure_ascii=False) + "\n")
+        self.written += 1
+
+    def _flush(self):
+        self.db.stage(self.batch)
+        self.batch = []
+
+    def close(self):
+        """Finish the file, return the number of entries actually stored"""
+        if self.format == "sqlite":
+            self._flush()
+            self.written = self.db.add_staged()
+            self.db.close()
+        else:
+            self.f.close()
+            os.replace(self.tmp, self.path)
+        return self.written
+
+# ---------------------------
+# Per-file jobs (run in worker processes)
+# ---------------------------
+def _top_job(job):
+    """Best n entries per mode of one file, via a bounded heap per mode"""
+    path, n, mode = job
+    stats = {}
+    heaps = {}
+    for seq, entry in enumerate(read_entries(path, stats)):
+        if mode is not None and entry[2] != mode:
+            continue
+        heap = heaps.setdefault(entry[2], [])
+        item = (entry[1], -seq, entry)   # higher score first, then earlier line
+        if len(heap) < n:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+    return path, stats, heaps
+
+def _validate_job(path):
+    stats = {"modes": dict.fromkeys(MODES, 0)}
+    for entry in read_entries(path, stats):
+        stats["modes"][entry[2]] += 1
+    return path, stats
+
+def _dedupe_job(job):
+    """Load one file into its own temporary SQLite db (rows get their content ids there)"""
+    path, tmp_db = job
+    stats = {}
+    writer = EntryWriter(tmp_db)
+    for entry in read_entries(path, stats):
+        writer.write(entry)
+    writer.close()
+    return path, stats
+
+def run_jobs(fn, jobs, workers=None):
+    """Map fn over jobs, in a process pool when there's more than one"""
+    if len(jobs) < 2 or workers == 1:
+        return [fn(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(fn, jobs, chunksize=1))
+
+# ---------------------------
+# Commands
+# ---------------------------
+def cmd_top(args):
+    if not args.files and args.n > store().top_k and file_format(LEADERBOARD_PATH) != "sqlite":
+        args.files = [LEADERBOARD_PATH]   # deeper than the text log's index: scan the log itself
+    if not args.files:
+        for mode in ([args.mode] if args.mode else MODES):
+            print(f"{mode} Top {args.n}:")
+            for i, e in enumerate(store().top(mode, args.n)):
+                print(f"{i + 1}. {e[0]} - {e[1]}pts")
+        return 0
+    results = run_jobs(_top_job, [(p, args.n, args.mode) for p in args.files], args.workers)
+    merged = {}
+    skipped = 0
+    for file_no, (_, stats, heaps) in enumerate(results):
+        skipped += stats["skipped"]
+        for mode, heap in heaps.items():
+            # ties go to the earlier file, then the earlier line
+            merged.setdefault(mode, []).extend(((s, -file_no, q), e) for s, q, e in heap)
+    for mode in ([args.mode] if args.mode else [m for m in MODES if m in merged]):
+        print(f"{mode} Top {args.n}:")
+        best = heapq.nlargest(args.n, merged.get(mode, []), key=lambda item: item[0])
+        for i, (_, e) in enumerate(best):
+            print(f"{i + 1}. {e[0]} - {e[1]}pts")
+    if skipped:
+        print(f"({skipped} malformed lines skipped)")
+    return 0
+
+def cmd_rank(args):
+    print(format_rank(*player_rank(args.score, args.mode)))
+    return 0
+
+def cmd_validate(args):
+    bad = 0
+    for path, stats in run_jobs(_validate_job, args.files, args.workers):
+        modes = ", ".join(f"{m} {n}" for m, n in stats["modes"].items())
+        print(f"{path}: {stats['read']} ok ({modes}), {stats['skipped']} malformed")
+        bad += stats["skipped"]
+    return 1 if bad and args.strict else 0
+
+def cmd_convert(args):
+    stats = {}
+    writer = EntryWriter(args.dst)
+    for entry in read_entries(args.src, stats):
+        writer.write(entry)
+    written = writer.close()
+    print(f"Wrote {written} of {stats['read']} entries to {args.dst}, skipped {stats['skipped']} malformed lines")
+    return 0
+
+def cmd_merge(args):
+    """Load each input in parallel, then fold them into the output; rows already there are skipped"""
+    with tempfile.TemporaryDirectory(prefix="lbmerge") as tmp:
+        jobs = [(p, os.path.join(tmp, f"{i}.db")) for i, p in enumerate(args.files)]
+        results = run_jobs(_dedupe_job, jobs, args.workers)
+        target = args.out if file_format(args.out) == "sqlite" else os.path.join(tmp, "merged.db")
+        if target != args.out and os.path.exists(args.out):
+            _dedupe_job((args.out, target))   # the output's own rows come first and stay
+        merged = SQLiteLeaderboard(target)
+        merged.conn.execute(f"PRAGMA cache_size=-{BULK_CACHE_KB}")
+        conn = merged.conn
+        count = lambda: conn.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+        before = count()
+        for (path, stats), (_, part) in zip(results, jobs):
+            conn.execute("ATTACH DATABASE ? AS part", (part,))
+            with conn:
+                conn.execute("INSERT OR IGNORE INTO scores (name, score, mode, ts, game_id) "
+                             "SELECT name, score, mode, ts, game_id FROM part.scores ORDER BY id")
+            conn.execute("DETACH DATABASE part")
+            print(f"{path}: {stats['read']} entries, {stats['skipped']} malformed")
+        total = count()
+        merged.close()
+        if target != args.out:
+            writer = EntryWriter(args.out)
+            for entry in read_entries(target):
+                writer.write(entry)
+            writer.close()
+    print(f"{args.out}: {total - before} new entries, {total} in total")
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Leaderboard operations (txt, csv, jsonl and sqlite files)")
+    parser.add_argument("--workers", type=int, default=None, help="processes for multi-file commands")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("top", help="best scores per mode (of the game's leaderboard, or of files)")
+    p.add_argument("files", nargs="*")
+    p.add_argument("-m", "--mode", choices=MODES)
+    p.add_argument("-n", type=int, default=5)
+    p.set_defaults(fn=cmd_top)
+
+    p = sub.add_parser("rank", help="rank of a score in the game's leaderboard")
+    p.add_argument("mode", choices=MODES)
+    p.add_argument("score", type=int)
+    p.set_defaults(fn=cmd_rank)
+
+    p = sub.add_parser("validate", help="count good and malformed records")
+    p.add_argument("files", nargs="+")
+    p.add_argument("--strict", action="store_true", help="exit with status 1 if anything is malformed")
+    p.set_defaults(fn=cmd_validate)
+
+    for name in ("convert", "import", "export"):
+        p = sub.add_parser(name, help="copy entries between formats (by file extension)")
+        p.add_argument("src")
+        p.add_argument("dst")
+        p.set_defaults(fn=cmd_convert)
+
+    p = sub.add_parser("merge", help="merge many leaderboards into one, dropping duplicates")
+    p.add_argument("out")
+    p.add_argument("files", nargs="+")
+    p.set_defaults(fn=cmd_merge)
+
+    args = parser.parse_args(argv)
+    return args.fn(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
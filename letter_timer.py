@@ -0,0 +1,86 @@
+# letter_timer.py
+import math
+from collections import deque
+from engine import IGNORED
+from instrument import percentile
+
+# ---------------------------
+# Letter countdown
+# ---------------------------
+class LetterTimer:
+    """Drives the engine's letter deadline from the Tk event loop.
+
+    The deadline itself lives in the engine on a monotonic clock, so a
+    late wake-up or a system clock change can't make it drift.  Only one
+    after() job is ever pending, timed for the moment the shown seconds
+    change (or the deadline passes), so an idle countdown doesn't wake the
+    loop for nothing.  Every job carries the generation it was scheduled
+    in; a job from a cancelled or restarted countdown does nothing, so each
+    timeout is handled exactly once.
+    """
+
+    def __init__(self, widget, engine, on_change, on_timeout, samples=500):
+        self.widget = widget
+        self.engine = engine
+        self.on_change = on_change      # called with whole seconds left
+        self.on_timeout = on_timeout    # called with the engine's tick() outcome
+        self.job = None
+        self.generation = 0
+        self.target = None
+        self.jitter = deque(maxlen=samples)   # ms between planned and actual wake-up
+
+    def cancel(self):
+        self.generation += 1
+        if self.job is not None:
+            try:
+                self.widget.after_cancel(self.job)
+            except Exception:
+                pass
+            self.job = None
+
+    def start(self):
+        """(Re)start ticking for the engine's current deadline"""
+        self.cancel()
+        if self.engine.deadline is not None:
+            self._fire(self.generation, planned=False)
+
+    def pause(self):
+        self.cancel()
+        self.engine.pause()
+
+    def resume(self):
+        self.engine.resume()
+        self.start()
+
+    def _schedule(self, generation):
+        remaining = self.engine.remaining()
+        # wake when the shown seconds, ceil(remaining), drop by one, or at the deadline
+        step = max(0, math.ceil(remaining) - 1)
+        delay = max(0.0, remaining - step)
+        self.target = self.engine.clock() + delay
+        self.job = self.widget.after(max(1, math.ceil(delay * 1000)), self._fire, generation)
+
+    def _fire(self, generation, planned=True):
+        if generation != self.generation:
+            return
+        self.job = None
+        if planned and self.target is not None:
+            self.jitter.append((self.engine.clock() - self.target) * 1000)
+        # ceil, not int: a wake-up a hair late would otherwise skip a second
+        self.on_change(math.ceil(self.engine.remaining()))
+        outcome = self.engine.tick()
+        if outcome != IGNORED:
+            self.generation += 1
+            self.on_timeout(outcome)
+            return
+        if self.engine.deadline is not None:
+            self._schedule(generation)
+
+    def jitter_stats(self):
+        """Wake-up lateness in ms (p50 / p99 / max) over the recent ticks"""
+        samples = sorted(self.jitter)
+        if not samples:
+            return {"ticks": 0}
+        return {"ticks": len(samples),
+                "p50_ms": round(percentile(samples, 0.5), 3), "p99_ms": round(percentile(samples, 0.99), 3),
+                "max_ms": round(samples[-1], 3), "mean_ms": round(sum(samples) / len(samples), 3)}
@@ -0,0 +1,310 @@
+# replay.py
+# Binary log of game events, and replays of it.
+#   python replay.py stats events.log
+#   python replay.py check events.log            (re-run every game headless, report mismatches)
+#   python replay.py bench events.log --repeat 50
+#   python replay.py play events.log --speed 4   (drive the real window)
+import os
+import sys
+import time
+import queue
+import struct
+import argparse
+import threading
+from collections import Counter
+from engine import GameEngine, IGNORED, CORRECT, GAME_OVER
+
+EVENTS_FILE = "events.log"
+MODE_CODES = ("Easy", "Medium", "Hard")
+
+# ---------------------------
+# Record format
+# ---------------------------
+# Every record is [kind u8][outcome u8][payload length u16][ms since game start u32][payload].
+# Times come from the game's monotonic clock.  Payloads:
+#   START  seed u64, wall-clock start f64, monotonic start f64, mode u8, lives u8,
+#          hints u8, time limit f32, then the player and each word as [len u8][utf-8]
+#   GUESS / WORD / HINT  the letter or text (utf-8); outcome is the engine's result
+#                        (CORRECT for a hint that was given)
+#   END    score u32, words reached u16
+#   others none
+START, GUESS, WORD, HINT, SKIP, TIMEOUT_EVENT, NEXT, PAUSE, RESUME, END = range(1, 11)
+KIND_NAMES = {START: "start", GUESS: "guess", WORD: "word", HINT: "hint", SKIP: "skip",
+              TIMEOUT_EVENT: "timeout", NEXT: "next", PAUSE: "pause", RESUME: "resume", END: "end"}
+_RECORD = struct.Struct("<BBHI")
+_START = struct.Struct("<QddBBBf")
+_END = struct.Struct("<IH")
+
+def _strings(*texts):
+    out = bytearray()
+    for text in texts:
+        raw = text.encode("utf-8")[:255]
+        out.append(len(raw))
+        out += raw
+    return bytes(out)
+
+def pack_start(seed, wall, mono, mode, lives, hints, time_limit, player, words):
+    return _START.pack(seed, wall, mono, MODE_CODES.index(mode), lives, hints, time_limit) + \
+        _strings(player, *words)
+
+def unpack_start(payload):
+    seed, wall, mono, mode, lives, hints, time_limit = _START.unpack_from(payload)
+    texts, pos = [], _START.size
+    while pos < len(payload):
+        n = payload[pos]
+        texts.append(payload[pos + 1:pos + 1 + n].decode("utf-8"))
+        pos += 1 + n
+    return {"seed": seed, "wall": wall, "mono": mono, "mode": MODE_CODES[mode], "lives": lives,
+            "hints": hints, "time_limit": time_limit, "player": texts[0], "words": texts[1:]}
+
+class Event:
+    __slots__ = ("kind", "outcome", "t", "payload")
+
+    def __init__(self, kind, outcome, t, payload):
+        self.kind = kind
+        self.outcome = outcome
+        self.t = t              # seconds since the game started
+        self.payload = payload
+
+    @property
+    def text(self):
+        return self.payload.decode("utf-8")
+
+def read_events(path):
+    """Stream Events from a log; a record cut short by a crash ends the stream"""
+    with open(path, "rb") as f:
+        while True:
+            head = f.read(_RECORD.size)
+            if len(head) < _RECORD.size:
+                return
+            kind, outcome, length, ms = _RECORD.unpack(head)
+            payload = f.read(length)
+            if len(payload) < length:
+                return
+            yield Event(kind, outcome, ms / 1000, payload)
+
+def read_games(path):
+    """Group events per game: yields (start info, [events after START])"""
+    info, events = None, []
+    for ev in read_events(path):
+        if ev.kind == START:
+            if info is not None:
+                yield info, events
+            info, events = unpack_start(ev.payload), []
+        elif info is not None:
+            events.append(ev)
+    if info is not None:
+        yield info, events
+
+# ---------------------------
+# Writer
+# ---------------------------
+class EventLog:
+    """Append-only event log written by a background thread.
+
+    record() only packs a few bytes and queues them, so the Tk thread never
+    touches the file.  The writer thread appends through a buffered file
+    and flushes whenever the queue goes quiet, or every flush_interval.
+    """
+
+    def __init__(self, path=EVENTS_FILE, clock=time.monotonic, flush_interval=1.0):
+        self.path = path
+        self.clock = clock
+        self.flush_interval = flush_interval
+        self.game_start = None
+        self.queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="event-log", daemon=True)
+        self._thread.start()
+
+    def start(self, seed, mode, player, words, lives, hints, time_limit):
+        self.game_start = self.clock()
+        payload = pack_start(seed, time.time(), self.game_start, mode, lives, hints, time_limit, player, words)
+        self.queue.put(_RECORD.pack(START, 0, len(payload), 0) + payload)
+
+    def record(self, kind, outcome=0, text="", payload=None):
+        if self.game_start is None:
+            return
+        if payload is None:
+            payload = text.encode("utf-8")
+        ms = min(0xFFFFFFFF, int((self.clock() - self.game_start) * 1000))
+        self.queue.put(_RECORD.pack(kind, outcome, len(payload), ms) + payload)
+
+    def end(self, score, words_reached):
+        self.record(END, GAME_OVER, payload=_END.pack(score, words_reached))
+        self.game_start = None
+
+    def close(self, timeout=2.0):
+        self.queue.put(None)
+        self._thread.join(timeout)
+
+    def _run(self):
+        with open(self.path, "ab", buffering=64 * 1024) as f:
+            while True:
+                try:
+                    item = self.queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    f.flush()
+                    continue
+                if item is None:
+                    return
+                f.write(item)
+                if self.queue.empty():
+                    f.flush()
+
+# ---------------------------
+# Headless replay
+# ---------------------------
+def replay_game(info, events, clock_offset=0.0, speed=None):
+    """Re-run one logged game on a fresh engine; returns (score, expected score, mismatches).
+
+    speed=None runs flat out; otherwise each event is applied when it's
+    due at speed x real time.
+    """
+    now = [clock_offset]
+    start = time.perf_counter()
+    engine = GameEngine(clock=lambda: now[0], lives=info["lives"], hints=info["hints"],
+                        time_limit=info["time_limit"])
+    engine.start(info["mode"], info["words"], info["player"])
+    mismatches = []
+    expected = None
+    for ev in events:
+        if speed:
+            delay = ev.t / speed - (time.perf_counter() - start)
+            if delay > 0:
+                time.sleep(delay)
+        now[0] = clock_offset + ev.t
+        kind = ev.kind
+        if kind == GUESS:
+            got = engine.guess(ev.text)
+        elif kind == WORD:
+            got = engine.guess_word(ev.text)
+        elif kind == HINT:
+            letter = engine.hint()
+            got = CORRECT if letter is not None and letter == ev.text else IGNORED
+        elif kind == SKIP:
+            got = engine.skip()
+        elif kind == TIMEOUT_EVENT:
+            # the log says the deadline passed; don't let ms rounding say otherwise
+            if engine.deadline is not None and now[0] < engine.deadline:
+                now[0] = engine.deadline
+            got = engine.tick()
+        elif kind == NEXT:
+            engine.next_word()
+            continue
+        elif kind == PAUSE:
+            engine.pause()
+            continue
+        elif kind == RESUME:
+            engine.resume()
+            continue
+        elif kind == END:
+            expected = _END.unpack(ev.payload)[0]
+            continue
+        else:
+            continue
+        if got != ev.outcome:
+            mismatches.append((ev.t, KIND_NAMES[kind], ev.payload, ev.outcome, got))
+    if expected is not None and expected != engine.score:
+        mismatches.append((events[-1].t if events else 0.0, "end", b"", expected, engine.score))
+    return engine.score, expected, mismatches
+
+def replay_log(path, speed=None):
+    """Replay every game of a log, yielding (info, score, expected, mismatches) as each ends"""
+    for info, events in read_games(path):
+        yield (info, *replay_game(info, events, speed=speed))
+
+# ---------------------------
+# Visible replay (drives the real window)
+# ---------------------------
+def play_in_window(path, speed=1.0):
+    import tempfile
+    scratch = tempfile.mkdtemp(prefix="replay")
+    # scores and decks go to a scratch dir, and the replay itself isn't logged
+    os.environ["GUESS_LEADERBOARD"] = os.path.join(scratch, "leaderboard.txt")
+    os.environ["GUESS_DECKS"] = os.path.join(scratch, "decks.jsonl")
+    os.environ["GUESS_EVENTS"] = ""
+    import Guesstheletter2
+    app = Guesstheletter2.GuessTheLetterGame()
+    now = [0.0]
+    app.engine.clock = lambda: now[0]
+    t0 = 0.0
+
+    def apply(info, ev):
+        if ev is None:
+            now[0] = 0.0
+            app.begin_game(info["player"], info["mode"], info["words"], info["seed"])
+            return
+        now[0] = ev.t
+        if ev.kind == GUESS:
+            app.check_guess(ev.text)
+        elif ev.kind == WORD:
+            app.entry_field.delete(0, "end")
+            app.entry_field.insert(0, ev.text)
+            app.check_entry_guess()
+        elif ev.kind == HINT:
+            app.use_hint()
+        elif ev.kind == SKIP:
+            app.skip_word()
+        elif ev.kind == TIMEOUT_EVENT:
+            if app.engine.deadline is not None:
+                now[0] = max(now[0], app.engine.deadline)
+            app.letter_timer.start()
+        elif ev.kind == NEXT:
+            app.next_word()
+        elif ev.kind == PAUSE:
+            app.letter_timer.pause()
+        elif ev.kind == RESUME:
+            app.letter_timer.resume()
+
+    for info, events in read_games(path):
+        app.after(int(t0 * 1000), apply, info, None)
+        for ev in events:
+            app.after(int((t0 + ev.t / speed) * 1000), apply, info, ev)
+        t0 += (events[-1].t if events else 0.0) / speed + 2.0
+    app.mainloop()
+
+# ---------------------------
+# CLI
+# ---------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect and replay game event logs")
+    parser.add_argument("command", choices=["stats", "check", "bench", "play"])
+    parser.add_argument("log", nargs="?", default=EVENTS_FILE)
+    parser.add_argument("--speed", type=float, default=None, help="x real time (play defaults to 1)")
+    parser.add_argument("--repeat", type=int, default=20, help="bench: passes over the log")
+    args = parser.parse_args(argv)
+
+    if args.command == "stats":
+        counts = Counter()
+        games = 0
+        for info, events in read_games(args.log):
+            games += 1
+            counts.update(KIND_NAMES.get(ev.kind, str(ev.kind)) for ev in events)
+        size = os.path.getsize(args.log)
+        print(f"{games} games, {sum(counts.values())} events, {size:,} bytes")
+        print("  " + ", ".join(f"{k} {n}" for k, n in sorted(counts.items())))
+    elif args.command == "check":
+        bad = 0
+        for info, score, expected, mismatches in replay_log(args.log, args.speed):
+            status = "ok" if not mismatches else f"{len(mismatches)} MISMATCHES"
+            print(f"{info['player']} {info['mode']} seed={info['seed']}: score {score} (logged {expected}) {status}")
+            for t, kind, payload, want, got in mismatches[:5]:
+                print(f"    at {t:.3f}s {kind} {payload!r}: logged outcome {want}, replay gave {got}")
+            bad += bool(mismatches)
+        return 1 if bad else 0
+    elif args.command == "bench":
+        games = list(read_games(args.log))
+        n_events = sum(len(events) for _, events in games)
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for info, events in games:
+                replay_game(info, events)
+        took = time.perf_counter() - start
+        print(f"{len(games) * args.repeat} games, {n_events * args.repeat:,} events in {took:.3f}s "
+              f"({n_events * args.repeat / took:,.0f} events/s)")
+    else:
+        play_in_window(args.log, args.speed or 1.0)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
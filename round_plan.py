@@ -0,0 +1,84 @@
+# round_plan.py
+import json
+import random
+from engine import ALPHABET
+
+OPTIONS_PER_LETTER = 4
+
+# ---------------------------
+# Plan records
+# ---------------------------
+class LetterRound:
+    """Everything shown while one letter is being guessed"""
+
+    __slots__ = ("letter", "options", "emoji", "display")
+
+    def __init__(self, letter, options, emoji, display):
+        self.letter = letter      # the correct letter
+        self.options = options    # the option buttons, left to right (a string, one letter each)
+        self.emoji = emoji
+        self.display = display    # the word with this and later letters masked
+
+class WordRound:
+    __slots__ = ("word", "letters")
+
+    def __init__(self, word, letters):
+        self.word = word
+        self.letters = letters
+
+class GamePlan:
+    """A whole game laid out up front: the UI only indexes into it.
+
+    The same words, seed and emoji map always give the same plan, and a
+    plan round-trips through to_json()/from_json(), so a game can be
+    replayed exactly.
+    """
+
+    __slots__ = ("mode", "seed", "words")
+
+    def __init__(self, mode, seed, words):
+        self.mode = mode
+        self.seed = seed
+        self.words = words
+
+    def round(self, word_index, letter_index):
+        """The LetterRound at this position, None past the end of a word or the game"""
+        if 0 <= word_index < len(self.words):
+            letters = self.words[word_index].letters
+            if 0 <= letter_index < len(letters):
+                return letters[letter_index]
+        return None
+
+    def to_json(self):
+        return json.dumps({
+            "mode": self.mode, "seed": self.seed,
+            "words": [[w.word, [[r.letter, r.options, r.emoji, r.display] for r in w.letters]] for w in self.words],
+        }, ensure_ascii=False, separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, text):
+        data = json.loads(text)
+        words = [WordRound(word, [LetterRound(*r) for r in rounds]) for word, rounds in data["words"]]
+        return cls(data["mode"], data["seed"], words)
+
+# ---------------------------
+# Building a plan
+# ---------------------------
+def build_plan(mode, words, emoji_map, fallback, seed, options=OPTIONS_PER_LETTER):
+    rng = random.Random(seed)
+    distractors = {}   # letter -> the alphabet without it, built once per letter
+    plan = []
+    for word in words:
+        word = word.upper()
+        rounds = []
+        for i, letter in enumerate(word):
+            pool = distractors.get(letter)
+            if pool is None:
+                pool = distractors[letter] = ALPHABET.replace(letter, "")
+            opts = rng.sample(pool, options - 1)
+            opts.insert(rng.randrange(options), letter)
+            emoji = rng.choice(emoji_map.get(letter) or [fallback])
+            display = " ".join(word[:i]) + (" " if i else "") + " ".join("_" * (len(word) - i))
+            rounds.append(LetterRound(letter, "".join(opts), emoji, display))
+        plan.append(WordRound(word, rounds))
+    return GamePlan(mode, seed, plan)
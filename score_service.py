@@ -0,0 +1,414 @@
+# score_service.py
+# One leaderboard shared by many game machines.
+#   python score_service.py serve --port 8765 --store scores.db
+#   python score_service.py bench --clients 50 --submissions 20000
+# Games point GUESS_SCORE_SERVER at host:port and talk to it through
+# RemoteLeaderboard, which falls back to the local leaderboard when the
+# service can't be reached.
+#
+# Protocol: one JSON object per line over TCP, answered in order.
+#   {"op": "submit", "entries": [[name, score, mode, ts, game_id], ...]} -> {"ok": true, "added": n}
+#   {"op": "top", "mode": m, "n": 5}                              -> {"ok": true, "top": [...]}
+#   {"op": "rank", "mode": m, "score": s}                         -> {"ok": true, "rank": [rank, total]}
+#   {"op": "load"}                                                -> {"ok": true, "modes": {m: [...]}}
+# Failures answer {"ok": false, "error": ...}, with "retry": true when the
+# store failed rather than the request, so sending it again later may work.
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from leaderboard_store import open_leaderboard, now_ts, MODES, TOP_K
+from instrument import percentile
+
+DEFAULT_PORT = 8765
+OFFLINE_QUEUE_FILE = "scores_offline.jsonl"
+MAX_BATCH = 1024        # submissions written per store transaction
+SYNC_INTERVAL = 5.0     # seconds between store syncs
+MAX_NAME = 40
+
+# ---------------------------
+# Service
+# ---------------------------
+class StoreError(Exception):
+    """The store failed (disk full, database locked...), not the request"""
+
+def _valid(entry):
+    """A clean (name, score, mode, ts, game_id) tuple, or None; the game id is optional"""
+    if not isinstance(entry, (list, tuple)) or len(entry) not in (4, 5):
+        return None
+    name, score, mode, ts = entry[:4]
+    game_id = entry[4] if len(entry) == 5 else None
+    if not isinstance(name, str) or not name or len(name) > MAX_NAME or "|" in name or "\n" in name:
+        return None
+    if mode not in MODES or not isinstance(score, int) or score < 0 or not isinstance(ts, str):
+        return None
+    if game_id is not None and not isinstance(game_id, str):
+        return None
+    return (name, score, mode, ts, game_id)
+
+class ScoreService:
+    """asyncio server in front of one leaderboard store.
+
+    Submissions from every connection meet in one queue; a single writer
+    task takes whatever has piled up (up to MAX_BATCH) and stores it with
+    one add_each() on a worker thread, so the write rate grows with load
+    instead of costing a transaction per game (group commit).  A submitter
+    is answered once its batch is stored.  Top-N per mode is cached in
+    memory and updated from each batch, so reads never touch the store.
+    """
+
+    def __init__(self, store, top_k=TOP_K, sync_interval=SYNC_INTERVAL):
+        self.store = store
+        self.top_k = top_k
+        self.sync_interval = sync_interval
+        self.io = ThreadPoolExecutor(max_workers=1, thread_name_prefix="score-store")
+        self.pending = None
+        self.top_cache = {m: [] for m in MODES}
+        self.top_keys = {m: [] for m in MODES}   # -score of each cached entry, for bisect
+        self.stats = {"submitted": 0, "batches": 0}
+
+    async def _store(self, fn, *args):
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.io, fn, *args)
+        except Exception as e:
+            raise StoreError(f"store failed: {e}") from e
+
+    async def start(self, host="127.0.0.1", port=DEFAULT_PORT):
+        self.pending = asyncio.Queue()
+        await self._reload_cache(MODES)
+        self.tasks = [asyncio.create_task(self._writer()), asyncio.create_task(self._syncer())]
+        self.server = await asyncio.start_server(self._handle, host, port)
+        return self.server
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+        await self.pending.join()
+        for task in self.tasks:
+            task.cancel()
+        await self._store(self.store.sync)
+        self.io.shutdown()
+
+    def _cache(self, entry):
+        """Put a new entry into the cached top list (after equal scores, like the store)"""
+        mode = entry[2]
+        keys = self.top_keys[mode]
+        i = bisect_right(keys, -entry[1])
+        if i < self.top_k:
+            keys.insert(i, -entry[1])
+            self.top_cache[mode].insert(i, entry)
+            del keys[self.top_k:], self.top_cache[mode][self.top_k:]
+
+    async def _reload_cache(self, modes):
+        for mode in modes:
+            self.top_cache[mode], self.top_keys[mode] = [], []
+            for entry in await self._store(self.store.top, mode, self.top_k):
+                self._cache(tuple(entry))
+
+    async def _writer(self):
+        while True:
+            batch = [await self.pending.get()]
+            while len(batch) < MAX_BATCH and not self.pending.empty():
+                batch.append(self.pending.get_nowait())
+            entries = [e[:4] for entries, _ in batch for e in entries]
+            game_ids = [e[4] for entries, _ in batch for e in entries]
+            try:
+                new = await self._store(self.store.add_each, entries, game_ids)
+                if all(new):
+                    for entry in entries:
+                        self._cache(entry)
+                else:
+                    await self._reload_cache({e[2] for e in entries})   # the store dropped resent games
+                error = None
+            except Exception as e:
+                error = e
+            self.stats["batches"] += 1
+            self.stats["submitted"] += len(entries)
+            pos = 0
+            for entries, done in batch:
+                if not done.done():
+                    if error is None:
+                        done.set_result(sum(new[pos:pos + len(entries)]))
+                    else:
+                        done.set_exception(error)
+                pos += len(entries)
+                self.pending.task_done()
+
+    async def _syncer(self):
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            await self._store(self.store.sync)
+
+    async def _dispatch(self, req):
+        op = req.get("op")
+        if op == "submit":
+            entries = [_valid(e) for e in req.get("entries", [])]
+            if None in entries:
+                return {"ok": False, "error": "malformed entry"}
+            done = asyncio.get_running_loop().create_future()
+            await self.pending.put((entries, done))
+            return {"ok": True, "added": await done}
+        if op == "top":
+            mode, n = req.get("mode"), int(req.get("n", 5))
+            if mode not in MODES:
+                return {"ok": False, "error": "unknown mode"}
+            if n <= self.top_k:
+                return {"ok": True, "top": self.top_cache[mode][:n]}
+            return {"ok": True, "top": await self._store(self.store.top, mode, n)}
+        if op == "rank":
+            if req.get("mode") not in MODES:
+                return {"ok": False, "error": "unknown mode"}
+            return {"ok": True, "rank": await self._store(self.store.rank, req["mode"], int(req["score"]))}
+        if op == "load":
+            return {"ok": True, "modes": self.top_cache}
+        if op == "ping":
+            return {"ok": True}
+        return {"ok": False, "error": f"unknown op {op!r}"}
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    reply = await self._dispatch(json.loads(line))
+                except StoreError as e:
+                    reply = {"ok": False, "error": str(e), "retry": True}
+                except Exception as e:
+                    reply = {"ok": False, "error": str(e)}
+                writer.write(json.dumps(reply).encode("utf-8") + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+async def serve(store_path, host, port):
+    service = ScoreService(open_leaderboard(store_path))
+    server = await service.start(host, port)
+    print(f"Score service on {host}:{port}, storing to {store_path}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.stop()
+
+# ---------------------------
+# Game-side client
+# ---------------------------
+class ServiceDown(Exception):
+    pass
+
+class Rejected(ServiceDown):
+    """The service is up but refused the request; sending it again won't help"""
+
+def _clean(entry):
+    """An entry as the service wants it (name cut to MAX_NAME), None if it would still refuse it"""
+    if isinstance(entry, (list, tuple)) and entry and isinstance(entry[0], str):
+        entry = [entry[0][:MAX_NAME]] + list(entry[1:])
+    valid = _valid(entry)
+    return None if valid is None else list(valid)
+
+def _checked(entries):
+    """Entries cleaned for sending; ones that can't be are dropped with a message"""
+    checked = []
+    for entry in entries:
+        clean = _clean(entry)
+        if clean is None:
+            print(f"Dropping malformed score {entry!r}")
+        else:
+            checked.append(clean)
+    return checked
+
+class RemoteLeaderboard:
+    """Leaderboard store backed by a score service, with the local store as stand-in.
+
+    One connection is kept open and reused; every call has a timeout.  If
+    the service can't be reached, scores go to the local store and to an
+    offline queue file, reads are answered locally, and the service isn't
+    tried again for retry_interval seconds.  Queued scores are sent once
+    it's back; the same goes when the service answers but its store
+    failed.  An entry the service refuses is dropped with a message
+    instead: it would be refused again, and queueing it would hold back
+    every score behind it.  Blocking, so call it from the score writer
+    thread.
+    """
+
+    def __init__(self, address, local, timeout=2.0, retry_interval=30.0, queue_path=OFFLINE_QUEUE_FILE):
+        host, _, port = address.rpartition(":")
+        self.address = (host or "127.0.0.1", int(port or DEFAULT_PORT))
+        self.local = local
+        self.timeout = timeout
+        self.retry_interval = retry_interval
+        self.queue_path = queue_path
+        self.sock = None
+        self.rfile = None
+        self.down_until = 0.0
+
+    def _disconnect(self):
+        if self.sock is not None:
+            try:
+                self.rfile.close()
+                self.sock.close()
+            except OSError:
+                pass
+        self.sock = self.rfile = None
+
+    def _call(self, req):
+        if time.monotonic() < self.down_until:
+            raise ServiceDown("service marked down")
+        try:
+            if self.sock is None:
+                self.sock = socket.create_connection(self.address, timeout=self.timeout)
+                self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                self.rfile = self.sock.makefile("rb")
+            self.sock.sendall(json.dumps(req).encode("utf-8") + b"\n")
+            line = self.rfile.readline()
+            if not line:
+                raise ConnectionError("connection closed")
+            reply = json.loads(line)
+        except (OSError, ValueError) as e:
+            self._disconnect()
+            self.down_until = time.monotonic() + self.retry_interval
+            raise ServiceDown(str(e))
+        if not reply.get("ok"):
+            if reply.get("retry"):
+                self.down_until = time.monotonic() + self.retry_interval
+                raise ServiceDown(reply.get("error", "store failed"))   # try again later, like a dropped connection
+            raise Rejected(reply.get("error", "request failed"))
+        return reply
+
+    def _queue_offline(self, entries):
+        # entries carry their game id, so a resend after a half-finished upload isn't stored twice
+        with open(self.queue_path, "a", encoding="utf-8") as f:
+            f.writelines(json.dumps(list(e)) + "\n" for e in entries)
+
+    def _send_offline(self):
+        """Send scores queued while the service was down (the store drops any game resent twice)"""
+        if not os.path.exists(self.queue_path):
+            return
+        entries = []
+        with open(self.queue_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    if line.strip():
+                        print(f"Dropping unreadable queued score {line.strip()!r}")
+        self._submit(_checked(entries))
+        os.remove(self.queue_path)
+
+    def _submit(self, entries):
+        """Send entries, return how many were added; refused ones are dropped, not retried"""
+        added = 0
+        for i in range(0, len(entries), MAX_BATCH):
+            batch = entries[i:i + MAX_BATCH]
+            try:
+                added += self._call({"op": "submit", "entries": batch})["added"]
+            except Rejected as e:
+                if len(batch) == 1:
+                    print(f"Score service refused {batch[0]} ({e}); dropped")
+                else:
+                    added += sum(self._submit([entry]) for entry in batch)   # find the bad ones
+        return added
+
+    # ----- store API -----
+    def add(self, name, score, mode, ts=None):
+        return self.add_many([(name, score, mode, ts or now_ts())])
+
+    def add_many(self, entries, game_ids=None):
+        entries = [list(e) for e in entries]
+        game_ids = game_ids if game_ids is not None else [None] * len(entries)
+        keyed = _checked([e + [g] for e, g in zip(entries, game_ids)])
+        try:
+            self._send_offline()
+            return self._submit(keyed)
+        except ServiceDown as e:
+            print(f"Score service unavailable ({e}); saving locally")
+            self._queue_offline(keyed)
+            return self.local.add_many([e[:4] for e in keyed], [e[4] for e in keyed])
+
+    def top(self, mode, n=5):
+        try:
+            return [tuple(e) for e in self._call({"op": "top", "mode": mode, "n": n})["top"]]
+        except ServiceDown:
+            return self.local.top(mode, n)
+
+    def rank(self, mode, score):
+        try:
+            return tuple(self._call({"op": "rank", "mode": mode, "score": score})["rank"])
+        except ServiceDown:
+            return self.local.rank(mode, score)
+
+    def load(self):
+        try:
+            modes = self._call({"op": "load"})["modes"]
+            return {m: [tuple(e) for e in modes.get(m, [])] for m in MODES}
+        except ServiceDown:
+            return self.local.load()
+
+    def sync(self):
+        self.local.sync()
+
+    def close(self):
+        self._disconnect()
+        self.local.close()
+
+# ---------------------------
+# Benchmark client
+# ---------------------------
+async def _bench_client(host, port, count, per_request, latencies, client_no):
+    reader, writer = await asyncio.open_connection(host, port)
+    for i in range(count):
+        entries = [[f"bench{client_no}", (i * 7 + j) % 60, MODES[(i + j) % 3], f"bench {client_no} {i} {j}"]
+                   for j in range(per_request)]
+        start = time.perf_counter()
+        writer.write(json.dumps({"op": "submit", "entries": entries}).encode("utf-8") + b"\n")
+        reply = json.loads(await reader.readline())
+        latencies.append(time.perf_counter() - start)
+        if not reply.get("ok"):
+            raise RuntimeError(reply)
+    writer.close()
+
+async def bench(host, port, clients, submissions, per_request):
+    latencies = []
+    per_client = max(1, submissions // clients)
+    start = time.perf_counter()
+    await asyncio.gather(*(_bench_client(host, port, per_client, per_request, latencies, c) for c in range(clients)))
+    took = time.perf_counter() - start
+    ms = sorted(t * 1000 for t in latencies)
+    total = len(latencies) * per_request
+    print(f"{total:,} scores from {clients} clients in {took:.2f}s: {total / took:,.0f} scores/s, "
+          f"latency p50 {percentile(ms, 0.5):.2f} ms, p99 {percentile(ms, 0.99):.2f} ms")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Shared leaderboard service")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("serve")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=DEFAULT_PORT)
+    p.add_argument("--store", default="scores.db", help="leaderboard file (*.db for SQLite)")
+    p = sub.add_parser("bench")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=DEFAULT_PORT)
+    p.add_argument("--clients", type=int, default=50)
+    p.add_argument("--submissions", type=int, default=20000)
+    p.add_argument("--per-request", type=int, default=1, help="scores per submit message")
+    args = parser.parse_args(argv)
+    try:
+        if args.command == "serve":
+            asyncio.run(serve(args.store, args.host, args.port))
+        else:
+            asyncio.run(bench(args.host, args.port, args.clients, args.submissions, args.per_request))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
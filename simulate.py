@@ -0,0 +1,162 @@
+# simulate.py
+# Monte Carlo simulator for tuning lives, timer, hints and word lists:
+#   python simulate.py --games 1000000 --modes Easy Medium Hard --policies random hint word
+# Bots play GameEngine on a simulated clock across a process pool (one seeded
+# RNG per batch, so a run is reproducible for a given --seed); results are
+# aggregated with NumPy.
+import sys
+import json
+import time
+import random
+import argparse
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from engine import GameEngine, IGNORED, WORD_DONE, LIVES_PER_GAME, HINTS_PER_WORD, LETTER_TIME_LIMIT
+from dictionary import EASY_WORDS, MEDIUM_WORDS, HARD_WORDS
+
+WORD_LISTS = {"Easy": EASY_WORDS, "Medium": MEDIUM_WORDS, "Hard": HARD_WORDS}
+WORDS_PER_GAME = 10
+OPTIONS = 4
+BATCH = 20000
+
+# ---------------------------
+# Bot policies
+# ---------------------------
+# A policy makes one move on the engine.  rng is the batch's random.Random,
+# cfg the simulation settings.  Wrong picks are sent as "?", which never
+# matches a letter, so no option list has to be built.
+
+def policy_random(engine, rng, cfg):
+    """Click one of the four options at random"""
+    return engine.guess(engine.letter() if rng.random() < 1 / OPTIONS else "?")
+
+def policy_hint(engine, rng, cfg):
+    """Spend every hint (and trust it), then click at random"""
+    letter = engine.hint()
+    if letter is not None:
+        return engine.guess(letter)
+    return policy_random(engine, rng, cfg)
+
+def policy_word(engine, rng, cfg):
+    """On a fresh word, type the full word if the bot recognises it; otherwise click"""
+    if engine.letter_index == 0:
+        word = engine.word()
+        if rng.random() < cfg["know_word"]:
+            return engine.guess_word(word)
+        if rng.random() < cfg["try_word"]:
+            return engine.guess_word(word[:-1] + ("A" if word[-1] != "A" else "B"))
+    return policy_random(engine, rng, cfg)
+
+POLICIES = {"random": policy_random, "hint": policy_hint, "word": policy_word}
+
+# ---------------------------
+# Worker
+# ---------------------------
+def run_batch(job):
+    """Play one batch of games; returns (mode, policy, scores bytes, words-reached bytes)"""
+    mode, policy_name, seed, games, cfg = job
+    rng = random.Random(seed)
+    now = [0.0]
+    engine = GameEngine(clock=lambda: now[0], lives=cfg["lives"],
+                        hints=cfg["hints"], time_limit=cfg["time_limit"])
+    policy = POLICIES[policy_name]
+    pool = sorted(set(WORD_LISTS[mode]))
+    per_game = min(cfg["words_per_game"], len(pool))
+    think = 1 / cfg["think"]
+    scores = array("H")
+    reached = array("B")
+    for _ in range(games):
+        engine.start(mode, rng.sample(pool, per_game))
+        while not engine.over:
+            now[0] += rng.expovariate(think)
+            outcome = engine.tick()
+            if outcome == IGNORED:
+                outcome = policy(engine, rng, cfg)
+            if outcome == WORD_DONE:
+                engine.next_word()
+        scores.append(min(engine.score, 65535))
+        reached.append(engine.word_index)
+    return mode, policy_name, scores.tobytes(), reached.tobytes()
+
+# ---------------------------
+# Aggregation
+# ---------------------------
+def summarize(scores, reached, words_per_game):
+    """Score distribution and survival curve for one (mode, policy) cell"""
+    p10, p50, p90, p99 = np.percentile(scores, [10, 50, 90, 99])
+    # survival[k] = share of games still running when word k+1 started, i.e. reached >= k
+    reached_counts = np.bincount(reached, minlength=words_per_game + 1)
+    ended_before = np.concatenate([[0], np.cumsum(reached_counts)[:words_per_game - 1]])
+    survival = 1.0 - ended_before / len(reached)
+    return {
+        "games": int(len(scores)),
+        "mean": float(scores.mean()),
+        "std": float(scores.std()),
+        "p10": float(p10), "p50": float(p50), "p90": float(p90), "p99": float(p99),
+        "max": int(scores.max()),
+        "completed": float((reached >= words_per_game).mean()),
+        "survival": [round(float(x), 4) for x in survival],
+        "histogram": np.bincount(scores).tolist(),
+    }
+
+def simulate(modes, policies, games, cfg, seed=0, workers=None, batch=BATCH):
+    cells = [(mode, policy, min(batch, games - start))
+             for mode in modes for policy in policies for start in range(0, games, batch)]
+    children = np.random.SeedSequence(seed).spawn(len(cells))
+    jobs = [(mode, policy, int(child.generate_state(1)[0]), n, cfg)
+            for (mode, policy, n), child in zip(cells, children)]
+    parts = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for mode, policy, s, r in pool.map(run_batch, jobs, chunksize=1):
+            parts.setdefault((mode, policy), ([], []))
+            parts[(mode, policy)][0].append(np.frombuffer(s, dtype=np.uint16))
+            parts[(mode, policy)][1].append(np.frombuffer(r, dtype=np.uint8))
+    results = {}
+    for (mode, policy), (s, r) in parts.items():
+        results.setdefault(mode, {})[policy] = summarize(
+            np.concatenate(s).astype(np.int64), np.concatenate(r).astype(np.int64), cfg["words_per_game"])
+    return results
+
+def print_report(results):
+    for mode, by_policy in results.items():
+        print(f"== {mode} ==")
+        for policy, r in by_policy.items():
+            print(f"  {policy:<7} games={r['games']:,}  mean={r['mean']:.2f}  std={r['std']:.2f}  "
+                  f"p10/50/90/99={r['p10']:.0f}/{r['p50']:.0f}/{r['p90']:.0f}/{r['p99']:.0f}  "
+                  f"max={r['max']}  finished={r['completed']:.1%}")
+            print("          survival by word: " + " ".join(f"{x:.2f}" for x in r["survival"]))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate many games with bot players")
+    parser.add_argument("--games", type=int, default=100000, help="games per mode and policy")
+    parser.add_argument("--modes", nargs="+", default=list(WORD_LISTS), choices=list(WORD_LISTS))
+    parser.add_argument("--policies", nargs="+", default=list(POLICIES), choices=list(POLICIES))
+    parser.add_argument("--lives", type=int, default=LIVES_PER_GAME)
+    parser.add_argument("--hints", type=int, default=HINTS_PER_WORD)
+    parser.add_argument("--time-limit", type=float, default=LETTER_TIME_LIMIT)
+    parser.add_argument("--words-per-game", type=int, default=WORDS_PER_GAME)
+    parser.add_argument("--think", type=float, default=6.0, help="mean seconds a bot takes per move")
+    parser.add_argument("--know-word", type=float, default=0.5, help="chance the word bot knows the word")
+    parser.add_argument("--try-word", type=float, default=0.2, help="chance it types a wrong word instead")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--batch", type=int, default=BATCH)
+    parser.add_argument("--json", help="also write the full results (with histograms) here")
+    args = parser.parse_args(argv)
+
+    cfg = {"lives": args.lives, "hints": args.hints, "time_limit": args.time_limit,
+           "words_per_game": args.words_per_game, "think": args.think,
+           "know_word": args.know_word, "try_word": args.try_word}
+    start = time.perf_counter()
+    results = simulate(args.modes, args.policies, args.games, cfg, args.seed, args.workers, args.batch)
+    took = time.perf_counter() - start
+    print_report(results)
+    total = args.games * len(args.modes) * len(args.policies)
+    print(f"{total:,} games in {took:.1f}s ({total / took:,.0f} games/s)")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"config": cfg, "results": results}, f)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+# sounds.py
+import time
+import threading
+from collections import deque
+
+# pygame is imported on first use so that starting the game doesn't wait for it
+SFX_CHANNELS = 4      # mixer channels reserved for sound effects
+MAX_OVERLAP = 2       # copies of the same effect allowed to play at once
+
+# ---------------------------
+# Sound effects
+# ---------------------------
+class SoundManager:
+    """Decode each effect once and play it on a reserved pool of mixer channels.
+
+    When every channel is busy, a new sound takes over the channel of the
+    oldest sound with the same or lower priority; if all of them outrank it,
+    it is dropped.  An effect already playing max_overlap times restarts its
+    oldest copy instead of stacking up.
+
+    Nothing plays until init_audio() has run, which the game does on a
+    background thread after the start screen is up.
+    """
+
+    def __init__(self, source, channels=SFX_CHANNELS, max_overlap=MAX_OVERLAP, priorities=None):
+        self.source = source
+        self.num_channels = channels
+        self.max_overlap = max_overlap
+        self.priorities = priorities or {}
+        self.sounds = {}         # name -> pygame Sound, or None if it couldn't be decoded
+        self.channels = None
+        self.playing = []        # per channel: [name, priority, started]
+        self.decode_ms = {}
+        self.latencies = deque(maxlen=1000)
+        self.played = 0
+        self.dropped = 0
+        self.ready = False
+        self.music_file = None
+        self.lock = threading.Lock()
+
+    def init_audio(self):
+        """Open the audio device; returns False (and stays silent) if there isn't one"""
+        import pygame
+        try:
+            pygame.mixer.init()
+        except pygame.error as e:
+            print(f"Audio unavailable: {e}")
+            return False
+        self._setup_channels()
+        self.ready = True
+        return True
+
+    def play_music(self, name, volume=0.3):
+        """Stream background music on a loop (the file stays open while it plays)"""
+        import pygame
+        try:
+            self.music_file = self.source.open(name)
+            pygame.mixer.music.load(self.music_file, name.rsplit(".", 1)[-1])
+            pygame.mixer.music.set_volume(volume)
+            pygame.mixer.music.play(-1)
+        except (pygame.error, OSError) as e:
+            print(f"Cannot play background music {name}: {e}")
+
+    def _setup_channels(self):
+        import pygame
+        if pygame.mixer.get_num_channels() < self.num_channels:
+            pygame.mixer.set_num_channels(self.num_channels)
+        pygame.mixer.set_reserved(self.num_channels)
+        self.channels = [pygame.mixer.Channel(i) for i in range(self.num_channels)]
+        self.playing = [[None, 0, 0.0] for _ in self.channels]
+
+    def load(self, name):
+        import pygame
+        with self.lock:
+            if name not in self.sounds:
+                start = time.perf_counter()
+                try:
+                    self.sounds[name] = pygame.mixer.Sound(self.source.open(name))
+                except (pygame.error, OSError) as e:
+                    print(f"Cannot load sound {name}: {e}")
+                    self.sounds[name] = None
+                self.decode_ms[name] = (time.perf_counter() - start) * 1000
+            return self.sounds[name]
+
+    def preload(self, names):
+        for name in names:
+            self.load(name)
+
+    def _pick_channel(self, name, priority):
+        busy = [i for i, ch in enumerate(self.channels) if ch.get_busy()]
+        same = [i for i in busy if self.playing[i][0] == name]
+        if len(same) >= self.max_overlap:
+            return min(same, key=lambda i: self.playing[i][2])
+        for i in range(len(self.channels)):
+            if i not in busy:
+                return i
+        victims = [i for i in busy if self.playing[i][1] <= priority]
+        if not victims:
+            return None
+        return min(victims, key=lambda i: (self.playing[i][1], self.playing[i][2]))
+
+    def play(self, name):
+        start = time.perf_counter()
+        if not self.ready:
+            return False
+        sound = self.load(name)
+        if sound is None:
+            return False
+        priority = self.priorities.get(name, 0)
+        i = self._pick_channel(name, priority)
+        if i is None:
+            self.dropped += 1
+            return False
+        self.channels[i].play(sound)
+        self.playing[i] = [name, priority, start]
+        self.played += 1
+        self.latencies.append((time.perf_counter() - start) * 1000)
+        return True
+
+    def metrics(self):
+        lat = sorted(self.latencies)
+        pct = lambda p: round(lat[min(len(lat) - 1, int(p * len(lat)))], 3) if lat else None
+        return {"decode_ms": {k: round(v, 3) for k, v in self.decode_ms.items()},
+                "played": self.played, "dropped": self.dropped,
+                "latency_ms_p50": pct(0.5), "latency_ms_p99": pct(0.99)}
@@ -0,0 +1,47 @@
+# startup.py
+import time
+import threading
+from contextlib import contextmanager
+
+PROCESS_START = time.perf_counter()   # imported first thing by the game
+
+# ---------------------------
+# Startup phase timing
+# ---------------------------
+class StartupTimer:
+    """Records how long each startup phase took, relative to process start"""
+
+    def __init__(self, t0=PROCESS_START):
+        self.t0 = t0
+        self.phases = []   # (name, start_ms, end_ms, thread name)
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(name, start, time.perf_counter())
+
+    def mark(self, name):
+        now = time.perf_counter()
+        self._record(name, now, now)
+
+    def _record(self, name, start, end):
+        with self.lock:
+            self.phases.append((name, (start - self.t0) * 1000, (end - self.t0) * 1000,
+                                threading.current_thread().name))
+
+    def at(self, name):
+        """ms since process start at which a phase (or mark) ended, None if it hasn't"""
+        with self.lock:
+            return next((end for n, _, end, _ in self.phases if n == name), None)
+
+    def report(self):
+        lines = ["Startup timeline (ms since process start):"]
+        with self.lock:
+            for name, start, end, thread in sorted(self.phases, key=lambda p: p[1]):
+                took = f"{end - start:8.1f} ms" if end > start else "         --"
+                lines.append(f"  {name:<22} {start:8.1f} -> {end:8.1f}  {took}  [{thread}]")
+        return "\n".join(lines)
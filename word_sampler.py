@@ -0,0 +1,226 @@
+# word_sampler.py
+import os
+import json
+import random
+from array import array
+from bisect import bisect_right, insort
+from itertools import accumulate
+
+DECKS_FILE = "decks.jsonl"
+
+# ---------------------------
+# Word pools
+# ---------------------------
+class WordPool:
+    """Every word once, plus a deduplicated index array per mode"""
+
+    def __init__(self, words_by_mode, weights=None):
+        self.words = []
+        self.ids = {}
+        self.modes = {}
+        self._add_modes(words_by_mode)
+        self.weights = {w.lower(): float(v) for w, v in (weights or {}).items()}
+        self._cumulative = {}
+
+    def _add_modes(self, words_by_mode):
+        for mode, words in words_by_mode.items():
+            seen = set()
+            ids = array("I")
+            for word in words:
+                key = word.lower()
+                if key in seen:
+                    continue
+                seen.add(key)
+                if key not in self.ids:
+                    self.ids[key] = len(self.words)
+                    self.words.append(key)
+                ids.append(self.ids[key])
+            self.modes[mode] = ids
+
+    def updated(self, words_by_mode):
+        """A new pool with these modes' lists replaced and every other mode shared.
+
+        The word table only ever grows, so it is shared as well: building
+        the new pool costs only the replaced lists, and this pool keeps
+        working for whoever still holds it.
+        """
+        pool = WordPool.__new__(WordPool)
+        pool.words, pool.ids, pool.weights = self.words, self.ids, self.weights
+        pool.modes = dict(self.modes)
+        pool._cumulative = {m: c for m, c in self._cumulative.items() if m not in words_by_mode}
+        pool._add_modes(words_by_mode)
+        return pool
+
+    def size(self, mode):
+        return len(self.modes[mode])
+
+    def word(self, mode, position):
+        return self.words[self.modes[mode][position]]
+
+    def cumulative(self, mode):
+        """Running total of word weights for a mode (built once, on first weighted draw)"""
+        if mode not in self._cumulative:
+            self._cumulative[mode] = list(accumulate(
+                max(0.0, self.weights.get(self.words[i], 1.0)) for i in self.modes[mode]))
+        return self._cumulative[mode]
+
+# ---------------------------
+# Per-player decks
+# ---------------------------
+_MASK64 = (1 << 64) - 1
+SHUFFLE_ROUNDS = 12   # fewer leave small decks visibly biased (some orders twice as likely as others)
+
+def _mix(x, key):
+    """64-bit hash of x under key (splitmix64 finaliser)"""
+    x = (x * 0x9E3779B97F4A7C15 + key) & _MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return x ^ (x >> 31)
+
+def shuffled_position(seed, n, i):
+    """Card i of a shuffle of range(n) chosen by seed, computed on its own.
+
+    A Feistel network permutes the smallest even-bit range that holds n;
+    values that land outside range(n) are fed through again (cycle
+    walking), which takes fewer than four passes on average.
+    """
+    half = max(1, ((n - 1).bit_length() + 1) // 2)
+    mask = (1 << half) - 1
+    x = i
+    while True:
+        left, right = x >> half, x & mask
+        for r in range(SHUFFLE_ROUNDS):
+            left, right = right, left ^ (_mix(right, seed + r) & mask)
+        x = (left << half) | right
+        if x < n:
+            return x
+
+class DeckSampler:
+    """Deals words from a shuffled deck per player and mode, saved between sessions.
+
+    The deck is a seeded pseudo-random permutation of the mode's pool
+    (shuffled_position), so a deck is just its seed and cursor: dealing k
+    words costs O(k) whatever the pool size, and a deck stays the same
+    few bytes however far it has been dealt.  A word comes back only after
+    the whole deck has been dealt.  Each draw appends the one deck it moved
+    to the decks file; older lines are dropped when the file is loaded.
+    """
+
+    def __init__(self, pool, path=DECKS_FILE, rng=None):
+        self.pool = pool
+        self.path = path
+        self.rng = rng if rng is not None else random.Random()
+        self.decks = None
+        self._positive = {}   # mode -> (cumulative table, how many of its words weigh > 0)
+
+    def _load(self):
+        if self.decks is None:
+            self.decks = {}
+            if not self.path:   # in-memory only (simulations, benchmarks)
+                return self.decks
+            lines = 0
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        lines += 1
+                        try:
+                            player, mode, n, cursor, seed = json.loads(line)
+                        except (ValueError, TypeError):
+                            continue   # torn last line of a crash
+                        self.decks.setdefault(player, {})[mode] = {"n": n, "cursor": cursor, "seed": seed}
+            except OSError:
+                return self.decks
+            if lines > 2 * sum(len(modes) for modes in self.decks.values()):
+                self._rewrite()
+        return self.decks
+
+    def _rewrite(self):
+        """Rewrite the decks file with one line per deck"""
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                for player, modes in self.decks.items():
+                    f.writelines(self._line(player, mode, deck) for mode, deck in modes.items())
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"Cannot save word decks: {e}")
+
+    @staticmethod
+    def _line(player, mode, deck):
+        return json.dumps([player, mode, deck["n"], deck["cursor"], deck["seed"]], ensure_ascii=False) + "\n"
+
+    def _save(self, player, mode, deck):
+        if not self.path:
+            return
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(self._line(player, mode, deck))
+        except OSError as e:
+            print(f"Cannot save word decks: {e}")
+
+    def _new_deck(self, n):
+        return {"n": n, "cursor": 0, "seed": self.rng.getrandbits(64)}
+
+    def _deck(self, player, mode):
+        n = self.pool.size(mode)
+        deck = self._load().setdefault(player, {}).get(mode)
+        if deck is None or deck["n"] != n:
+            deck = self.decks[player][mode] = self._new_deck(n)   # new player, or the pool changed
+        return deck
+
+    def _deal_one(self, deck):
+        """Next card of the shuffle (a position in the mode's pool)"""
+        if deck["cursor"] >= deck["n"]:
+            deck.update(self._new_deck(deck["n"]))   # deck used up: start a fresh shuffle
+        card = shuffled_position(deck["seed"], deck["n"], deck["cursor"])
+        deck["cursor"] += 1
+        return card
+
+    def draw(self, player, mode, k):
+        """k different words for this player's next game"""
+        k = min(k, self.pool.size(mode))
+        player = player.lower()
+        deck = self._deck(player, mode)
+        picked = []
+        while len(picked) < k:
+            card = self._deal_one(deck)
+            if card not in picked:   # only possible right after a reshuffle
+                picked.append(card)
+        self._save(player, mode, deck)
+        return [self.pool.word(mode, p) for p in picked]
+
+    def _positive_count(self, mode, cumulative):
+        cached = self._positive.get(mode)
+        if cached is None or cached[0] is not cumulative:
+            count = sum(1 for prev, cur in zip([0.0] + cumulative, cumulative) if cur > prev)
+            cached = self._positive[mode] = (cumulative, count)
+        return cached[1]
+
+    def draw_weighted(self, mode, k):
+        """k different words chosen by weight (doesn't touch anyone's deck).
+
+        Sampling without replacement: each draw is made over the weight
+        left after the words already picked, stepping over their spans of
+        the cumulative table, so it never retries and never needs more
+        words than weigh anything (k is capped at that count).
+        """
+        cumulative = self.pool.cumulative(mode)
+        k = min(k, self._positive_count(mode, cumulative))
+        left = cumulative[-1] if k else 0.0
+        picked = []
+        spans = []   # (start, weight) of the picked words, by start
+        while len(picked) < k:
+            r = self.rng.random() * left
+            for start, weight in spans:
+                if r < start:
+                    break
+                r += weight
+            p = min(bisect_right(cumulative, r), len(cumulative) - 1)
+            start = cumulative[p - 1] if p else 0.0
+            weight = cumulative[p] - start
+            if weight <= 0 or p in picked:
+                continue   # rounding put r on a boundary; draw again
+            picked.append(p)
+            insort(spans, (start, weight))
+            left -= weight
+        return [self.pool.word(mode, p) for p in picked]
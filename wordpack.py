@@ -0,0 +1,265 @@
+# wordpack.py
+import os
+import sys
+import json
+import mmap
+import struct
+from bisect import bisect_left
+from itertools import accumulate
+from collections import namedtuple
+from collections.abc import Mapping, Sequence
+from asset_bundle import BASE_DIR
+
+PACK_FILE = "words.pack"
+MAGIC = b"GTLWPAK1"
+_HEADER = struct.Struct("<8sI")   # magic, length of the JSON header that follows
+
+# ---------------------------
+# Pack format
+# ---------------------------
+# [magic][header length][JSON header][sections...]
+# The header holds the emoji map and, per section, where it starts and how
+# many strings it has.  A section is (count + 1) little-endian uint32 offsets
+# followed by the UTF-8 strings back to back; string i is blob[off[i]:off[i+1]].
+# Word sections are sorted by (first letter, length, word), so every letter
+# and every letter + length is one contiguous run; the header stores those
+# runs as {"A": [start, end, {"3": [start, end], ...}], ...}.  The image
+# section holds "word\0path" strings sorted by word, for binary search.
+
+def _sort_key(word):
+    return (word[0].upper(), len(word), word)
+
+def _write_section(out, strings):
+    blobs = [s.encode("utf-8") for s in strings]
+    offsets = [0, *accumulate(len(b) for b in blobs)]
+    out.write(struct.pack(f"<{len(offsets)}I", *offsets))
+    out.writelines(blobs)
+    pad = -out.tell() % 4   # keep the next offsets table aligned
+    out.write(b"\0" * pad)
+
+def build_pack(out_path, words_by_mode, images=None, emoji=None, fallback="❓"):
+    """Write a word pack; returns the number of words per mode"""
+    header = {"modes": {}, "emoji": emoji or {}, "fallback": fallback}
+    sections = []
+    counts = {}
+    for mode, words in words_by_mode.items():
+        unique = sorted({w.strip().lower() for w in words if w.strip()}, key=_sort_key)
+        letters = {}
+        for i, word in enumerate(unique):
+            run = letters.setdefault(word[0].upper(), [i, i, {}])
+            run[1] = i + 1
+            span = run[2].setdefault(str(len(word)), [i, i])
+            span[1] = i + 1
+        header["modes"][mode] = {"count": len(unique), "letters": letters}
+        sections.append((header["modes"][mode], unique))
+        counts[mode] = len(unique)
+    pairs = sorted((w.lower(), p) for w, p in (images or {}).items())
+    header["images"] = {"count": len(pairs)}
+    sections.append((header["images"], [f"{w}\0{p}" for w, p in pairs]))
+
+    # section offsets depend on the header length, so lay the data out first
+    offset = 0
+    for meta, strings in sections:
+        meta["offset"] = offset
+        size = 4 * (len(strings) + 1) + sum(len(s.encode("utf-8")) for s in strings)
+        offset += size + (-size % 4)
+    raw = json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    raw += b" " * (-(_HEADER.size + len(raw)) % 4)
+    tmp = out_path + ".tmp"
+    with open(tmp, "wb") as out:
+        out.write(_HEADER.pack(MAGIC, len(raw)))
+        out.write(raw)
+        for _, strings in sections:
+            _write_section(out, strings)
+    os.replace(tmp, out_path)
+    return counts
+
+def build_from_dictionary(out_path):
+    import dictionary
+    words = {"Easy": dictionary.EASY_WORDS, "Medium": dictionary.MEDIUM_WORDS, "Hard": dictionary.HARD_WORDS}
+    return build_pack(out_path, words, dictionary.WORD_IMAGES, dictionary.LETTER_EMOJI_MAP, dictionary.FALLBACK_EMOJI)
+
+def build_from_tsv(out_path, tsv_path, emoji=None):
+    """Build from "mode<TAB>word[<TAB>image]" lines (for big or translated packs)"""
+    import dictionary
+    words, images = {}, {}
+    with open(tsv_path, "r", encoding="utf-8") as f:
+        for line in f:
+            parts = line.rstrip("\n").split("\t")
+            if len(parts) < 2 or not parts[1].strip():
+                continue
+            words.setdefault(parts[0], []).append(parts[1])
+            if len(parts) > 2 and parts[2]:
+                images[parts[1].strip()] = parts[2]
+    return build_pack(out_path, words, images, emoji or dictionary.LETTER_EMOJI_MAP, dictionary.FALLBACK_EMOJI)
+
+# ---------------------------
+# Reading a pack
+# ---------------------------
+class _Strings(Sequence):
+    """One section of the mapped pack; strings are decoded only when asked for"""
+
+    def __init__(self, mm, start, count):
+        self.count = count
+        self.offsets = memoryview(mm)[start:start + 4 * (count + 1)].cast("I")
+        self.blob = start + 4 * (count + 1)
+        self.mm = mm
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self.count))]
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        return self.mm[self.blob + self.offsets[i]:self.blob + self.offsets[i + 1]].decode("utf-8")
+
+class WordSection(_Strings):
+    """Words of one mode, sorted by first letter, then length"""
+
+    def __init__(self, mm, start, meta):
+        super().__init__(mm, start, meta["count"])
+        self.letters = meta["letters"]
+
+    def span(self, letter, length=None):
+        """(start, end) positions of the words starting with letter (and of that length)"""
+        run = self.letters.get(letter.upper())
+        if run is None:
+            return (0, 0)
+        if length is None:
+            return (run[0], run[1])
+        return tuple(run[2].get(str(length), (0, 0)))
+
+    def words(self, letter, length=None):
+        start, end = self.span(letter, length)
+        return self[start:end]
+
+class ImageMap(Mapping):
+    """word -> image path, looked up by binary search in the mapped pack"""
+
+    def __init__(self, strings):
+        self.strings = strings
+
+    def _find(self, word):
+        key = word.lower() + "\0"
+        i = bisect_left(self.strings, key)
+        if i < len(self.strings):
+            entry = self.strings[i]
+            if entry.startswith(key):
+                return entry[len(key):]
+        return None
+
+    def __getitem__(self, word):
+        path = self._find(word)
+        if path is None:
+            raise KeyError(word)
+        return path
+
+    def __contains__(self, word):
+        return self._find(word) is not None
+
+    def __iter__(self):
+        return (entry.split("\0", 1)[0] for entry in self.strings)
+
+    def __len__(self):
+        return len(self.strings)
+
+class WordPack:
+    """A word pack mapped into memory.
+
+    Opening it reads only the header; a mode's words are paged in by the
+    OS as they're dealt.  Offers the same size()/word()/cumulative() as
+    word_sampler.WordPool, so it can back a DeckSampler directly.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, header_len = _HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC:
+            self.mm.close()
+            raise ValueError(f"{path} is not a word pack")
+        self.data_start = _HEADER.size + header_len
+        self.header = json.loads(self.mm[_HEADER.size:self.data_start].decode("utf-8"))
+        self.emoji = self.header["emoji"]
+        self.fallback = self.header["fallback"]
+        self.modes = list(self.header["modes"])
+        self._sections = {}
+        self._cumulative = {}
+        self._images = None
+
+    def section(self, mode):
+        if mode not in self._sections:
+            meta = self.header["modes"][mode]
+            self._sections[mode] = WordSection(self.mm, self.data_start + meta["offset"], meta)
+        return self._sections[mode]
+
+    @property
+    def images(self):
+        if self._images is None:
+            meta = self.header["images"]
+            self._images = ImageMap(_Strings(self.mm, self.data_start + meta["offset"], meta["count"]))
+        return self._images
+
+    def size(self, mode):
+        return self.header["modes"][mode]["count"]
+
+    def word(self, mode, position):
+        return self.section(mode)[position]
+
+    def cumulative(self, mode):
+        """Uniform weights (the pack doesn't store any)"""
+        if mode not in self._cumulative:
+            self._cumulative[mode] = list(range(1, self.size(mode) + 1))
+        return self._cumulative[mode]
+
+    def close(self):
+        for section in self._sections.values():
+            section.offsets.release()
+        if self._images is not None:
+            self._images.strings.offsets.release()
+        self._sections.clear()
+        self._images = None
+        self.mm.close()
+
+# ---------------------------
+# Game content, from the pack or dictionary.py
+# ---------------------------
+WordContent = namedtuple("WordContent", "pool images emoji fallback")
+
+def load_words(path=PACK_FILE, base_dir=BASE_DIR):
+    """Words, image paths and emoji from the pack if there is one, else from dictionary.py"""
+    if not os.path.isabs(path):
+        path = os.path.join(base_dir, path)
+    if os.path.exists(path):
+        try:
+            pack = WordPack(path)
+            return WordContent(pack, pack.images, pack.emoji, pack.fallback)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring word pack {path}: {e}")
+    import dictionary
+    from word_sampler import WordPool
+    pool = WordPool({"Easy": dictionary.EASY_WORDS, "Medium": dictionary.MEDIUM_WORDS, "Hard": dictionary.HARD_WORDS})
+    return WordContent(pool, dictionary.WORD_IMAGES, dictionary.LETTER_EMOJI_MAP, dictionary.FALLBACK_EMOJI)
+
+if __name__ == "__main__":
+    # python wordpack.py build [out.pack] [words.tsv]   (default: the lists in dictionary.py)
+    # python wordpack.py info [pack]
+    args = sys.argv[1:]
+    if args and args[0] == "build":
+        out = args[1] if len(args) > 1 else os.path.join(BASE_DIR, PACK_FILE)
+        counts = build_from_tsv(out, args[2]) if len(args) > 2 else build_from_dictionary(out)
+        print(f"Wrote {out}: " + ", ".join(f"{m} {n}" for m, n in counts.items()))
+    elif args and args[0] == "info":
+        pack = WordPack(args[1] if len(args) > 1 else os.path.join(BASE_DIR, PACK_FILE))
+        for mode in pack.modes:
+            letters = pack.header["modes"][mode]["letters"]
+            print(f"{mode}: {pack.size(mode)} words, {len(letters)} first letters")
+        print(f"images: {len(pack.images)}")
+        pack.close()
+    else:
+        print("usage: wordpack.py build [out] [words.tsv] | info [pack]")